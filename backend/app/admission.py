@@ -0,0 +1,201 @@
+"""Admission control and load shedding.
+
+Each request is classified by route into a class with its own concurrency
+limit and bounded wait queue (``ROUTE_CLASSES``). The DB session limiter
+in ``app.database`` additionally orders waiters by class priority, so
+interactive lookups such as ``read_patient`` are served before bulk list
+and export traffic.
+
+A request is rejected straight away with 503 and ``Retry-After`` when the
+queue is full, or when the expected wait would exceed the latency budget.
+The expected wait is estimated from the queue depth and the recent
+service time. A request that is queued but not admitted within the budget
+is rejected as well.
+
+Limits are configured with environment variables, e.g.
+``ADMISSION_BULK_LIMIT=4`` or ``ADMISSION_INTERACTIVE_MAX_WAIT=0.5``.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+# Lower value = served first when waiting for a DB session
+PRIORITIES = {"interactive": 0, "write": 1, "bulk": 2}
+
+# (methods, path pattern, class); first match wins, unmatched routes are not limited
+ROUTE_CLASSES: List[Tuple[Tuple[str, ...], "re.Pattern", str]] = [
+    (("GET",), re.compile(r"^/api/(patients|assessments|treatments)/\d+/?$"), "interactive"),
+    (("GET",), re.compile(r"^/api/search/?$"), "interactive"),
+    (("POST", "PATCH", "PUT", "DELETE"), re.compile(r"^/api/exports/"), "bulk"),
+    (("POST", "PATCH", "PUT", "DELETE"), re.compile(r"^/api/"), "write"),
+    (("GET",), re.compile(r"^/api/(?!health|metrics)"), "bulk"),
+]
+
+# class: (concurrency limit, queue size, latency budget in seconds)
+DEFAULT_LIMITS: Dict[str, Tuple[int, int, float]] = {
+    "interactive": (32, 128, 1.0),
+    "write": (16, 64, 2.0),
+    "bulk": (4, 16, 5.0),
+}
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted within its latency budget"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Overloaded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded, priority-ordered wait queue"""
+
+    def __init__(self, name: str, limit: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        # Exponentially weighted mean time a slot is held, for wait estimates
+        self._service_time = 0.05
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    def expected_wait(self) -> float:
+        return (self.queue_depth + 1) * self._service_time / self.limit
+
+    def _reject(self) -> Overloaded:
+        self.rejected += 1
+        return Overloaded(retry_after=max(1.0, self.expected_wait()))
+
+    async def acquire(self, priority: int = 0) -> float:
+        """Wait for a slot; returns the acquisition time to pass to release()"""
+        if self.in_flight < self.limit and not self.queue_depth:
+            self.in_flight += 1
+            self.admitted += 1
+            return time.monotonic()
+        if self.queue_depth >= self.max_queue or self.expected_wait() > self.max_wait:
+            raise self._reject()
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the timer fired; give it back
+                self._release_slot()
+            waiter.cancel()
+            self.timed_out += 1
+            raise self._reject()
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            waiter.cancel()
+            raise
+        self.admitted += 1
+        return time.monotonic()
+
+    def release(self, acquired_at: Optional[float] = None) -> None:
+        if acquired_at is not None:
+            elapsed = time.monotonic() - acquired_at
+            self._service_time = 0.9 * self._service_time + 0.1 * elapsed
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        # Hand the slot straight to the highest-priority live waiter
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "max_wait": self.max_wait,
+            "mean_service_time": round(self._service_time, 4),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+def _limiter_from_env(name: str, defaults: Tuple[int, int, float]) -> AdmissionLimiter:
+    prefix = f"ADMISSION_{name.upper()}"
+    limit, max_queue, max_wait = defaults
+    return AdmissionLimiter(
+        name,
+        limit=int(os.getenv(f"{prefix}_LIMIT", limit)),
+        max_queue=int(os.getenv(f"{prefix}_QUEUE", max_queue)),
+        max_wait=float(os.getenv(f"{prefix}_MAX_WAIT", max_wait)),
+    )
+
+
+route_limiters: Dict[str, AdmissionLimiter] = {
+    name: _limiter_from_env(name, defaults) for name, defaults in DEFAULT_LIMITS.items()
+}
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    for methods, pattern, route_class in ROUTE_CLASSES:
+        if method in methods and pattern.match(path):
+            return route_class
+    return None
+
+
+def overloaded_response(error: Overloaded) -> JSONResponse:
+    return JSONResponse(
+        {"detail": "Server is overloaded, please retry later"},
+        status_code=503,
+        headers={"Retry-After": str(math.ceil(error.retry_after))},
+    )
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware applying the per-class route limiters"""
+
+    def __init__(self, app, limiters: Optional[Dict[str, AdmissionLimiter]] = None):
+        self.app = app
+        self.limiters = route_limiters if limiters is None else limiters
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify(scope["method"], scope["path"])
+        limiter = self.limiters.get(route_class)
+        # Read by get_db to order DB session waiters
+        scope.setdefault("state", {})["priority"] = PRIORITIES.get(route_class, PRIORITIES["write"])
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            acquired_at = await limiter.acquire(PRIORITIES[route_class])
+        except Overloaded as e:
+            await overloaded_response(e)(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(acquired_at)
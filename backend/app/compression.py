@@ -0,0 +1,332 @@
+"""Negotiated response compression (zstd, brotli or gzip).
+
+The encoding is chosen from the request's ``Accept-Encoding`` q-values,
+preferring zstd, then brotli, then gzip on ties. zstd and brotli are
+optional dependencies (``poetry install -E compression``); gzip is always
+available. Responses are left alone when they are smaller than
+``COMPRESSION_MIN_SIZE``, already encoded, or not of a compressible type
+(Parquet parts, for instance, are compressed internally).
+
+Bodies are compressed chunk by chunk, so ``StreamingResponse`` and
+``FileResponse`` bodies are never buffered beyond the size threshold. Each
+chunk is flushed to the client as it is produced. Chunks of at least
+``COMPRESSION_THREAD_SIZE`` bytes are compressed in a worker thread, which
+keeps large exports from blocking the event loop.
+
+Responses that carry an ``ETag`` are cached after compression, keyed by
+path, ETag and encoding, so repeated downloads of the same snapshot part
+are only compressed once.
+"""
+import asyncio
+import os
+import re
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional "compression" extra
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional "compression" extra
+    brotli = None
+
+# Snapshot parts (Parquet, Arrow IPC) are already zstd-compressed and sent as is
+COMPRESSIBLE_TYPES = re.compile(r"^(text/|application/(json|x-ndjson|javascript|xml|[\w.-]+\+json)\b)")
+UNCOMPRESSIBLE_STATUS = {204, 206, 304}
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        # wbits 16 + MAX_WBITS writes a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+# encoding: (encoder, default level), in server preference order.
+# Levels favour speed, since most responses are compressed per request.
+ENCODERS: Dict[str, Tuple[Callable, int]] = {}
+if zstandard is not None:
+    ENCODERS["zstd"] = (ZstdEncoder, 3)
+if brotli is not None:
+    ENCODERS["br"] = (BrotliEncoder, 4)
+ENCODERS["gzip"] = (GzipEncoder, 6)
+
+
+def negotiate(accept_encoding: str, encodings: Sequence[str]) -> Optional[str]:
+    """Pick the supported encoding with the highest q-value; ``encodings`` breaks ties"""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        match = re.search(r"q\s*=\s*([0-9.]+)", params)
+        try:
+            weights[name.strip().lower()] = float(match.group(1)) if match else 1.0
+        except ValueError:
+            weights[name.strip().lower()] = 0.0
+
+    best, best_weight = None, 0.0
+    for name in encodings:
+        weight = weights.get(name, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = name, weight
+    return best
+
+
+class CompressedCache:
+    """LRU of compressed bodies bounded by their total size"""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Tuple[str, ...], bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, ...]) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key: Tuple[str, ...], body: bytes) -> None:
+        if len(body) > self.max_entry_bytes or key in self._entries:
+            return
+        self._entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+compressed_cache = CompressedCache(
+    max_bytes=int(os.getenv("COMPRESSION_CACHE_BYTES", 64 * 1024 * 1024)),
+    max_entry_bytes=int(os.getenv("COMPRESSION_CACHE_ENTRY_BYTES", 8 * 1024 * 1024)),
+)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with the negotiated encoding"""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: Optional[int] = None,
+        thread_size: Optional[int] = None,
+        levels: Optional[Dict[str, int]] = None,
+        cache: Optional[CompressedCache] = None,
+    ):
+        self.app = app
+        self.minimum_size = (
+            int(os.getenv("COMPRESSION_MIN_SIZE", 1024)) if minimum_size is None else minimum_size
+        )
+        self.thread_size = (
+            int(os.getenv("COMPRESSION_THREAD_SIZE", 64 * 1024)) if thread_size is None else thread_size
+        )
+        self.levels = {
+            name: int(os.getenv(f"COMPRESSION_{name.upper()}_LEVEL", level))
+            for name, (_, level) in ENCODERS.items()
+        }
+        self.levels.update(levels or {})
+        self.cache = compressed_cache if cache is None else cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), list(ENCODERS))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, scope, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-response state: buffers up to the threshold, then passes through or compresses"""
+
+    def __init__(self, middleware: CompressionMiddleware, scope, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.path = scope["path"] + "?" + scope.get("query_string", b"").decode("latin-1")
+        self._send = send
+        self.mode: Optional[str] = None  # "identity", "compress" or "cached"
+        self.start: Optional[dict] = None
+        self.buffer = bytearray()
+        self.encoder = None
+        self.cache_key: Optional[Tuple[str, ...]] = None
+        self.cached_parts: Optional[List[bytes]] = None
+
+    async def send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.mode is None:
+            self.mode = self._choose_mode()
+            if self.mode == "cached":
+                cached = self.middleware.cache.get(self.cache_key)
+                if cached is not None:
+                    await self._send_start(len(cached))
+                    await self._send({"type": "http.response.body", "body": cached})
+                    return
+                self.mode = "compress"
+
+        if self.mode == "cached":
+            # The cached body has been sent; discard what the app still produces
+            return
+        if self.mode == "identity":
+            await self._send_identity(message)
+        else:
+            await self._send_compressed(message)
+
+    def _choose_mode(self) -> str:
+        headers = Headers(raw=self.start["headers"])
+        if (
+            self.start["status"] in UNCOMPRESSIBLE_STATUS
+            or "content-encoding" in headers
+            or "no-transform" in headers.get("cache-control", "")
+            or not COMPRESSIBLE_TYPES.match(headers.get("content-type", ""))
+        ):
+            return "identity"
+        etag = headers.get("etag")
+        if etag is not None:
+            self.cache_key = (self.path, etag, self.encoding)
+            return "cached"
+        return "compress"
+
+    async def _send_identity(self, message) -> None:
+        if self.start is not None:
+            await self._send(self.start)
+            self.start = None
+        await self._send(message)
+
+    async def _send_compressed(self, message) -> None:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            self.buffer += body
+            if more_body and len(self.buffer) < self.middleware.minimum_size:
+                return
+            body, self.buffer = bytes(self.buffer), bytearray()
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # Too small to be worth it; send the original response unchanged
+                self.mode = "identity"
+                await self._send_identity({"type": "http.response.body", "body": body})
+                return
+            encoder, _ = ENCODERS[self.encoding]
+            self.encoder = encoder(self.middleware.levels[self.encoding])
+            if self.cache_key is not None:
+                self.cached_parts = []
+
+            if not more_body:
+                compressed = await self._compress(body, final=True)
+                await self._send_start(len(compressed))
+                await self._send({"type": "http.response.body", "body": compressed})
+                self._cache(compressed)
+                return
+            await self._send_start(None)
+
+        compressed = await self._compress(body, final=not more_body)
+        if self.cached_parts is not None:
+            self.cached_parts.append(compressed)
+            if sum(len(part) for part in self.cached_parts) > self.middleware.cache.max_entry_bytes:
+                self.cached_parts = None
+        if compressed or not more_body:
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+        if not more_body and self.cached_parts is not None:
+            self._cache(b"".join(self.cached_parts))
+
+    async def _compress(self, data: bytes, final: bool) -> bytes:
+        encoder = self.encoder
+
+        def compress() -> bytes:
+            return encoder.compress(data) + (encoder.finish() if final else encoder.flush())
+
+        if len(data) >= self.middleware.thread_size:
+            return await asyncio.to_thread(compress)
+        return compress()
+
+    def _cache(self, body: bytes) -> None:
+        if self.cache_key is not None:
+            self.middleware.cache.put(self.cache_key, body)
+
+    async def _send_start(self, content_length: Optional[int]) -> None:
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if content_length is None:
+            del headers["content-length"]
+        else:
+            headers["content-length"] = str(content_length)
+        etag = headers.get("etag")
+        if etag is not None and etag.endswith('"'):
+            # Each representation needs its own validator
+            headers["etag"] = f'{etag[:-1]}-{self.encoding}"'
+        await self._send({**self.start, "headers": headers.raw})
+        self.start = None
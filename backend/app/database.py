@@ -1,25 +1,173 @@
 import os
+import math
+import time
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import List, Optional
 from dotenv import load_dotenv
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
+from app.admission import AdmissionLimiter, Overloaded, PRIORITIES
+
 # Load environment variables
 load_dotenv()
 
-DATABASE_URL = os.getenv("DATABASE_URL")
 
-# Convert SQLite URL to async format
-if DATABASE_URL and DATABASE_URL.startswith("sqlite:"):
-    DATABASE_URL = DATABASE_URL.replace("sqlite:", "sqlite+aiosqlite:", 1)
+def async_url(url: Optional[str]) -> Optional[str]:
+    """Convert SQLite URL to async format"""
+    if url and url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    return url
+
+
+DATABASE_URL = async_url(os.getenv("DATABASE_URL"))
 
 engine = create_async_engine(DATABASE_URL, echo=True)
 SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Comma-separated replica URLs for GET traffic, e.g. a second SQLite file
+# kept in sync by the operator, or a Postgres streaming replica
+READ_REPLICA_URLS = [url.strip() for url in os.getenv("READ_REPLICA_URLS", "").split(",") if url.strip()]
+
+# Seconds a client reads from the primary after a write (read-your-writes)
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+PRIMARY_COOKIE = "primary_until"
+
+# Bounded, priority-ordered wait for DB sessions so overload sheds requests
+# instead of queueing them on the engine without limit
+session_limiter = AdmissionLimiter(
+    "db_sessions",
+    limit=int(os.getenv("DB_MAX_SESSIONS", 10)),
+    max_queue=int(os.getenv("DB_SESSION_QUEUE", 100)),
+    max_wait=float(os.getenv("DB_SESSION_MAX_WAIT", 2.0)),
+)
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_async_engine(async_url(url))
+        self.sessionmaker = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.healthy = True
+        self.checked_at = 0.0
+
+
+class ReplicaSet:
+    """Round-robin over read replicas, skipping ones that failed their last health check.
+
+    Health checks run in a background task (``start``), so picking a replica
+    never waits on a slow or unreachable server.
+    """
+
+    def __init__(self, urls: List[str], health_interval: float = 5.0, health_timeout: float = 1.0):
+        self.replicas = [Replica(url) for url in urls]
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self._cursor = itertools.count()
+        self._monitor: Optional[asyncio.Task] = None
+
+    async def _ping(self, replica: Replica) -> None:
+        async with replica.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def check(self, replica: Replica) -> bool:
+        replica.checked_at = time.monotonic()
+        try:
+            # Bounds the connect as well as the query, for servers that drop connections
+            await asyncio.wait_for(self._ping(replica), timeout=self.health_timeout)
+            replica.healthy = True
+        except Exception:
+            replica.healthy = False
+        return replica.healthy
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+
+    async def _run_monitor(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.check_all()
+
+    async def start(self) -> None:
+        """Check every replica once, then keep re-checking them in the background"""
+        if not self.replicas or self._monitor is not None:
+            return
+        await self.check_all()
+        self._monitor = asyncio.create_task(self._run_monitor())
 
-async def get_db():
-    """Dependency for getting async DB session"""
-    session = SessionLocal()
+    async def stop(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+
+    def pick(self) -> Optional[Replica]:
+        """Next healthy replica, or None to fall back to the primary"""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._cursor) % len(self.replicas)]
+            if replica.healthy:
+                return replica
+        return None
+
+
+read_replicas = ReplicaSet(READ_REPLICA_URLS)
+
+
+@asynccontextmanager
+async def limited_session(request: Request, session_factory):
+    """Open a session once the DB session limiter admits the request"""
+    priority = getattr(request.state, "priority", PRIORITIES["write"])
+    try:
+        acquired_at = await session_limiter.acquire(priority)
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Database is overloaded, please retry later",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    session = session_factory()
     try:
         yield session
     finally:
         await session.close()
+        session_limiter.release(acquired_at)
+
+
+async def get_db(request: Request):
+    """Dependency for getting async DB session on the primary"""
+    async with limited_session(request, SessionLocal) as session:
+        yield session
+
+
+async def get_write_db(response: Response, db: AsyncSession = Depends(get_db)):
+    """Dependency for mutations; pins the client's reads to the primary for a short window"""
+    response.set_cookie(
+        PRIMARY_COOKIE,
+        str(int(time.time()) + READ_YOUR_WRITES_SECONDS),
+        max_age=READ_YOUR_WRITES_SECONDS,
+        httponly=True,
+        samesite="lax",
+    )
+    return db
+
+
+async def get_read_db(request: Request):
+    """Dependency for reads; uses a healthy replica unless the client just wrote"""
+    session_factory = SessionLocal
+    try:
+        sticky = int(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        sticky = False
+    if not sticky:
+        replica = read_replicas.pick()
+        if replica is not None:
+            session_factory = replica.sessionmaker
+    async with limited_session(request, session_factory) as session:
+        yield session
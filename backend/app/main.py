@@ -1,15 +1,36 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routers import patients, assessments, treatments
+from app.admission import AdmissionControlMiddleware, route_limiters
+from app.compression import CompressionMiddleware, compressed_cache
+from app.database import read_replicas, session_limiter
+from app.routers import patients, assessments, treatments, fmri, exports, search
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Replica health checks run in the background, off the request path
+    await read_replicas.start()
+    yield
+    await read_replicas.stop()
+
 
 app = FastAPI(
     title="Clinical Health Platform API",
     description="API for depression treatment with executive control network dysfunction",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
-# Configure CORS
+# Shed load before it queues on the database
+app.add_middleware(AdmissionControlMiddleware)
+
+# Compress admitted responses (zstd, brotli or gzip, as the client accepts)
+app.add_middleware(CompressionMiddleware)
+
+# Configure CORS (added last so it also wraps 503 responses from admission control)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],  # React frontend
@@ -22,9 +43,27 @@ app.add_middleware(
 app.include_router(patients.router, prefix="/api/patients", tags=["patients"])
 app.include_router(assessments.router, prefix="/api/assessments", tags=["assessments"])
 app.include_router(treatments.router, prefix="/api/treatments", tags=["treatments"])
+app.include_router(fmri.router, prefix="/api/fmri", tags=["fmri"])
+app.include_router(exports.router, prefix="/api/exports", tags=["exports"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
 
 
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "ok"}
+
+
+@app.get("/api/metrics/admission")
+async def admission_metrics():
+    """Queue depth and rejection counters for admission control"""
+    return {
+        "routes": {name: limiter.stats() for name, limiter in route_limiters.items()},
+        "db_sessions": session_limiter.stats(),
+    }
+
+
+@app.get("/api/metrics/compression")
+async def compression_metrics():
+    """Hit and size counters for the compressed response cache"""
+    return compressed_cache.stats()
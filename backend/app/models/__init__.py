@@ -3,3 +3,9 @@ from app.models.base import Base
 from app.models.patient import Patient
 from app.models.assessment import Assessment
 from app.models.treatment import Treatment
+from app.models.biomarker_series import BiomarkerPoint
+from app.models.fmri_feature import FmriFeature
+from app.models.import_checkpoint import ImportCheckpoint
+from app.models.search import SEARCH_KINDS
+from app.models.archive import ArchiveWatermark, assessments_archive, treatments_archive
+from app.models.backfill_checkpoint import BackfillCheckpoint
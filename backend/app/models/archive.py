@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Date, DateTime, Index, String, Table
+from sqlalchemy.sql import func
+
+from app.models.base import Base
+from app.models.assessment import Assessment
+from app.models.treatment import Treatment
+
+
+def _archive_table(source: Table, name: str) -> Table:
+    """Cold copy of a table's columns, without foreign keys or secondary indexes"""
+    columns = [
+        Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+        for c in source.columns
+    ]
+    return Table(
+        name,
+        Base.metadata,
+        *columns,
+        Column("archived_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+        Index(f"ix_{name}_patient_id", "patient_id"),
+    )
+
+
+assessments_archive = _archive_table(Assessment.__table__, "assessments_archive")
+treatments_archive = _archive_table(Treatment.__table__, "treatments_archive")
+
+
+class ArchiveWatermark(Base):
+    """Rows of a table dated before ``archived_before`` may live in its archive table"""
+    __tablename__ = "archive_watermarks"
+
+    table_name = Column(String, primary_key=True)
+    archived_before = Column(Date, nullable=False)
@@ -6,6 +6,8 @@ from app.models.base import Base, TimeStampMixin
 
 class Assessment(Base, TimeStampMixin):
     __tablename__ = "assessments"
+    # Never reuse the id of a deleted or archived row (SQLite otherwise hands out max(id) again)
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
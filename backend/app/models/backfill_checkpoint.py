@@ -0,0 +1,19 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, UniqueConstraint
+
+from app.models.base import Base, TimeStampMixin
+
+
+class BackfillCheckpoint(Base, TimeStampMixin):
+    """Progress of one worker of a batched backfill, committed together with each chunk"""
+    __tablename__ = "backfill_checkpoints"
+    __table_args__ = (UniqueConstraint("name", "worker", name="uq_backfill_checkpoints_name_worker"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    worker = Column(Integer, nullable=False)
+    workers = Column(Integer, nullable=False)  # Worker count the key ranges were planned for
+    start_key = Column(BigInteger, nullable=False)  # Exclusive lower bound of the worker's key range
+    end_key = Column(BigInteger, nullable=True)  # Inclusive upper bound; open ended for the last worker
+    last_key = Column(BigInteger, nullable=False)  # Highest key processed so far
+    rows_processed = Column(Integer, nullable=False, default=0)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
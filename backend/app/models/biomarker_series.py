@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Index, UniqueConstraint
+
+from app.models.base import Base
+
+
+class BiomarkerPoint(Base):
+    """One measurement of a tracked metric, denormalised out of an assessment row.
+
+    Kept narrow on purpose so per-patient trend queries only touch the
+    (patient_id, metric, recorded_on) index instead of full assessment rows.
+    """
+    __tablename__ = "biomarker_series"
+
+    id = Column(Integer, primary_key=True)
+    patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
+    # No foreign key: the long-term trend keeps its points when an assessment is archived
+    assessment_id = Column(Integer, nullable=False, index=True)
+    metric = Column(String, nullable=False)  # e.g., "crp_level", "wpai_score"
+    recorded_on = Column(Date, nullable=False)
+    value = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_biomarker_series_lookup", "patient_id", "metric", "recorded_on"),
+        UniqueConstraint("assessment_id", "metric", name="uq_biomarker_series_assessment_metric"),
+    )
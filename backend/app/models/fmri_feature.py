@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+
+from app.models.base import Base, TimeStampMixin
+
+
+class FmriFeature(Base, TimeStampMixin):
+    """ECN summary features extracted from an assessment's fmri_data payload"""
+    __tablename__ = "fmri_features"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # No foreign key: features stay in place when their assessment is archived
+    assessment_id = Column(Integer, unique=True, nullable=False)
+    patient_id = Column(Integer, ForeignKey("patients.id"), index=True, nullable=False)
+    
+    # Executive control network activation (N-back contrast)
+    ecn_mean_activation = Column(Float, index=True, nullable=True)
+    ecn_peak_activation = Column(Float, nullable=True)
+    n_back_load_effect = Column(Float, nullable=True)  # Highest minus lowest load activation
+    
+    # Executive control network functional connectivity
+    ecn_mean_connectivity = Column(Float, index=True, nullable=True)
+    ecn_region_count = Column(Integer, nullable=True)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, BigInteger
+
+from app.models.base import Base, TimeStampMixin
+
+
+class ImportCheckpoint(Base, TimeStampMixin):
+    """Progress of a bulk import, committed together with each imported chunk"""
+    __tablename__ = "import_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String, unique=True, nullable=False)  # "<kind>:<absolute file path>"
+    byte_offset = Column(BigInteger, nullable=False, default=0)  # End of the last committed record
+    records_read = Column(Integer, nullable=False, default=0)
+    rows_imported = Column(Integer, nullable=False, default=0)
+    rows_rejected = Column(Integer, nullable=False, default=0)
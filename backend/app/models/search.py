@@ -0,0 +1,75 @@
+"""Full-text search index over patient names/emails and clinical notes.
+
+SQLite: a standalone FTS5 table, ``search_index``, kept in sync by triggers
+on the source tables. Its rowid encodes the source row as
+``id * 4 + kind`` so triggers update the index by rowid instead of scanning.
+
+PostgreSQL: GIN indexes on the ``to_tsvector`` expressions below, which the
+search query repeats verbatim so the planner can use them.
+"""
+from sqlalchemy import DDL, event
+
+from app.models.base import Base
+
+SEARCH_KINDS = {"patient": 1, "assessment": 2, "treatment": 3}
+
+
+def patient_search_text(row: str = "") -> str:
+    """Searchable text of a patient row; ``row`` qualifies the columns, e.g. "new." """
+    return f"{row}first_name || ' ' || {row}last_name || ' ' || {row}email"
+
+
+_PATIENT = SEARCH_KINDS["patient"]
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+    "body, patient_id UNINDEXED, tokenize='unicode61', prefix='2 3')",
+    # Patients: name and email
+    "CREATE TRIGGER IF NOT EXISTS patients_search_ai AFTER INSERT ON patients BEGIN "
+    f"INSERT INTO search_index(rowid, body, patient_id) "
+    f"VALUES (new.id * 4 + {_PATIENT}, {patient_search_text('new.')}, new.id); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS patients_search_au AFTER UPDATE OF first_name, last_name, email ON patients BEGIN "
+    f"DELETE FROM search_index WHERE rowid = old.id * 4 + {_PATIENT}; "
+    f"INSERT INTO search_index(rowid, body, patient_id) "
+    f"VALUES (new.id * 4 + {_PATIENT}, {patient_search_text('new.')}, new.id); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS patients_search_ad AFTER DELETE ON patients BEGIN "
+    f"DELETE FROM search_index WHERE rowid = old.id * 4 + {_PATIENT}; "
+    "END",
+]
+
+# Assessments and treatments: notes
+for _table, _kind in (("assessments", SEARCH_KINDS["assessment"]), ("treatments", SEARCH_KINDS["treatment"])):
+    SQLITE_SEARCH_DDL += [
+        f"CREATE TRIGGER IF NOT EXISTS {_table}_search_ai AFTER INSERT ON {_table} WHEN new.notes IS NOT NULL BEGIN "
+        f"INSERT INTO search_index(rowid, body, patient_id) VALUES (new.id * 4 + {_kind}, new.notes, new.patient_id); "
+        "END",
+        f"CREATE TRIGGER IF NOT EXISTS {_table}_search_au AFTER UPDATE OF notes ON {_table} BEGIN "
+        f"DELETE FROM search_index WHERE rowid = old.id * 4 + {_kind}; "
+        f"INSERT INTO search_index(rowid, body, patient_id) "
+        f"SELECT new.id * 4 + {_kind}, new.notes, new.patient_id WHERE new.notes IS NOT NULL; "
+        "END",
+        f"CREATE TRIGGER IF NOT EXISTS {_table}_search_ad AFTER DELETE ON {_table} BEGIN "
+        f"DELETE FROM search_index WHERE rowid = old.id * 4 + {_kind}; "
+        "END",
+    ]
+
+POSTGRES_SEARCH_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_patients_search ON patients "
+    f"USING gin (to_tsvector('simple', {patient_search_text()}))",
+    "CREATE INDEX IF NOT EXISTS ix_assessments_notes_search ON assessments "
+    "USING gin (to_tsvector('english', coalesce(notes, '')))",
+    "CREATE INDEX IF NOT EXISTS ix_treatments_notes_search ON treatments "
+    "USING gin (to_tsvector('english', coalesce(notes, '')))",
+]
+
+# Create the index alongside the tables (e.g. Base.metadata.create_all in tests)
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in POSTGRES_SEARCH_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+event.listen(
+    Base.metadata,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS search_index").execute_if(dialect="sqlite"),
+)
@@ -1,51 +1,93 @@
-from typing import List
+from datetime import date
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import update, delete
 
-from app.database import get_db
+from app.database import get_read_db, get_write_db
 from app.models.assessment import Assessment
 from app.schemas.assessment import AssessmentCreate, Assessment as AssessmentSchema, AssessmentUpdate
+from app.routers.projection import Fields, FieldSelector, select_fields, fetch_first, project
+from app.services.archive import assessment_criteria, is_archived, reaches_archive, read_archived, tiered_select
+from app.services.timeseries import sync_assessment_series, clear_assessment_series
+from app.services.fmri_features import sync_fmri_features, clear_fmri_features
 
 router = APIRouter()
 
 
 @router.post("/", response_model=AssessmentSchema)
-async def create_assessment(assessment: AssessmentCreate, db: AsyncSession = Depends(get_db)):
+async def create_assessment(assessment: AssessmentCreate, db: AsyncSession = Depends(get_write_db)):
     db_assessment = Assessment(**assessment.model_dump())
     db.add(db_assessment)
+    await db.flush()
+    await sync_assessment_series(db, db_assessment)
+    await sync_fmri_features(db, db_assessment)
     await db.commit()
     await db.refresh(db_assessment)
     return db_assessment
 
 
 @router.get("/", response_model=List[AssessmentSchema])
-async def read_assessments(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Assessment).offset(skip).limit(limit))
-    assessments = result.scalars().all()
-    return assessments
+async def read_assessments(
+    skip: int = 0,
+    limit: int = 100,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    fields: Fields = Depends(FieldSelector(AssessmentSchema)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """All history by default; archived assessments are skipped when from_date is after the watermark"""
+    criteria = assessment_criteria(from_date=from_date, to_date=to_date)
+    include_archive = await reaches_archive(db, "assessments", from_date)
+    result = await db.execute(
+        tiered_select(Assessment, fields, criteria, include_archive).offset(skip).limit(limit)
+    )
+    assessments = result.all()
+    return project(AssessmentSchema, fields, assessments)
 
 
 @router.get("/patient/{patient_id}", response_model=List[AssessmentSchema])
-async def read_patient_assessments(patient_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Assessment).filter(Assessment.patient_id == patient_id))
-    assessments = result.scalars().all()
-    return assessments
+async def read_patient_assessments(
+    patient_id: int,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    fields: Fields = Depends(FieldSelector(AssessmentSchema)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """All history by default; archived assessments are skipped when from_date is after the watermark"""
+    criteria = assessment_criteria(patient_id=patient_id, from_date=from_date, to_date=to_date)
+    include_archive = await reaches_archive(db, "assessments", from_date)
+    result = await db.execute(tiered_select(Assessment, fields, criteria, include_archive))
+    assessments = result.all()
+    return project(AssessmentSchema, fields, assessments)
+
+
+async def _missing(db: AsyncSession, assessment_id: int) -> HTTPException:
+    """404, or 409 for an archived assessment, which is read-only"""
+    if await is_archived(db, "assessments", assessment_id):
+        return HTTPException(status_code=409, detail="Assessment is archived and read-only")
+    return HTTPException(status_code=404, detail="Assessment not found")
 
 
 @router.get("/{assessment_id}", response_model=AssessmentSchema)
-async def read_assessment(assessment_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Assessment).filter(Assessment.id == assessment_id))
-    assessment = result.scalars().first()
+async def read_assessment(
+    assessment_id: int,
+    fields: Fields = Depends(FieldSelector(AssessmentSchema)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    result = await db.execute(select_fields(Assessment, fields).filter(Assessment.id == assessment_id))
+    assessment = fetch_first(result, fields)
+    if assessment is None:
+        assessment = await read_archived(db, "assessments", assessment_id, fields)
     if assessment is None:
         raise HTTPException(status_code=404, detail="Assessment not found")
-    return assessment
+    return project(AssessmentSchema, fields, assessment)
 
 
 @router.patch("/{assessment_id}", response_model=AssessmentSchema)
 async def update_assessment(
-    assessment_id: int, assessment_update: AssessmentUpdate, db: AsyncSession = Depends(get_db)
+    assessment_id: int, assessment_update: AssessmentUpdate, db: AsyncSession = Depends(get_write_db)
 ):
     # Filter out None values
     update_data = {k: v for k, v in assessment_update.model_dump().items() if v is not None}
@@ -55,31 +97,42 @@ async def update_assessment(
         result = await db.execute(select(Assessment).filter(Assessment.id == assessment_id))
         assessment = result.scalars().first()
         if assessment is None:
-            raise HTTPException(status_code=404, detail="Assessment not found")
+            raise await _missing(db, assessment_id)
         return assessment
     
     # Update assessment
     await db.execute(
         update(Assessment).where(Assessment.id == assessment_id).values(**update_data)
     )
-    await db.commit()
     
     # Get updated assessment
-    result = await db.execute(select(Assessment).filter(Assessment.id == assessment_id))
+    result = await db.execute(
+        select(Assessment)
+        .filter(Assessment.id == assessment_id)
+        .execution_options(populate_existing=True)
+    )
     updated_assessment = result.scalars().first()
     if updated_assessment is None:
-        raise HTTPException(status_code=404, detail="Assessment not found")
+        await db.rollback()
+        raise await _missing(db, assessment_id)
+    
+    await sync_assessment_series(db, updated_assessment)
+    if "fmri_data" in update_data:
+        await sync_fmri_features(db, updated_assessment)
+    await db.commit()
     
     return updated_assessment
 
 
 @router.delete("/{assessment_id}")
-async def delete_assessment(assessment_id: int, db: AsyncSession = Depends(get_db)):
+async def delete_assessment(assessment_id: int, db: AsyncSession = Depends(get_write_db)):
     result = await db.execute(select(Assessment).filter(Assessment.id == assessment_id))
     assessment = result.scalars().first()
     if assessment is None:
-        raise HTTPException(status_code=404, detail="Assessment not found")
+        raise await _missing(db, assessment_id)
     
+    await clear_assessment_series(db, assessment_id)
+    await clear_fmri_features(db, assessment_id)
     await db.execute(delete(Assessment).where(Assessment.id == assessment_id))
     await db.commit()
     
@@ -0,0 +1,49 @@
+import asyncio
+import os
+import re
+from pathlib import Path
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_db
+from app.schemas.snapshot import SnapshotRequest, SnapshotPart
+from app.services.snapshot import SNAPSHOT_TABLES, SnapshotMismatch, SnapshotUnavailable, export_snapshot
+
+router = APIRouter()
+
+SNAPSHOT_DIR = Path(os.getenv("SNAPSHOT_DIR", "snapshots"))
+PART_FILE_PATTERN = re.compile(r"^part-\d{5}\.(parquet|arrow)$")
+PART_MEDIA_TYPES = {".parquet": "application/vnd.apache.parquet", ".arrow": "application/vnd.apache.arrow.file"}
+
+# Snapshots append numbered part files, so only one may run at a time
+_snapshot_lock = asyncio.Lock()
+
+
+@router.post("/snapshot", response_model=List[SnapshotPart])
+async def create_snapshot(request: SnapshotRequest, db: AsyncSession = Depends(get_read_db)):
+    async with _snapshot_lock:
+        try:
+            return await export_snapshot(
+                db,
+                SNAPSHOT_DIR,
+                tables=request.tables,
+                fmt=request.format,
+                fmri=request.fmri,
+                full=request.full,
+            )
+        except SnapshotUnavailable as e:
+            raise HTTPException(status_code=501, detail=str(e))
+        except SnapshotMismatch as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/snapshot/{table}/{filename}")
+async def download_snapshot_part(table: str, filename: str):
+    if table not in SNAPSHOT_TABLES or not PART_FILE_PATTERN.match(filename):
+        raise HTTPException(status_code=404, detail="Snapshot file not found")
+    path = SNAPSHOT_DIR / table / filename
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Snapshot file not found")
+    return FileResponse(path, media_type=PART_MEDIA_TYPES[path.suffix], filename=filename)
@@ -0,0 +1,33 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_db
+from app.models.fmri_feature import FmriFeature
+from app.schemas.fmri_feature import FmriFeature as FmriFeatureSchema
+from app.routers.projection import Fields, FieldSelector, select_fields, fetch_all, project
+
+router = APIRouter()
+
+
+@router.get("/features", response_model=List[FmriFeatureSchema])
+async def read_fmri_features(
+    patient_id: Optional[int] = None,
+    max_mean_activation: Optional[float] = None,
+    max_mean_connectivity: Optional[float] = None,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Fields = Depends(FieldSelector(FmriFeatureSchema)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """List extracted ECN features, e.g. hypoactive/hypoconnected subtype candidates"""
+    query = select_fields(FmriFeature, fields)
+    if patient_id is not None:
+        query = query.filter(FmriFeature.patient_id == patient_id)
+    if max_mean_activation is not None:
+        query = query.filter(FmriFeature.ecn_mean_activation <= max_mean_activation)
+    if max_mean_connectivity is not None:
+        query = query.filter(FmriFeature.ecn_mean_connectivity <= max_mean_connectivity)
+    result = await db.execute(query.order_by(FmriFeature.id).offset(skip).limit(limit))
+    features = fetch_all(result, fields)
+    return project(FmriFeatureSchema, fields, features)
@@ -1,18 +1,22 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import update, delete
 
-from app.database import get_db
+from app.database import get_read_db, get_write_db
 from app.models.patient import Patient
+from app.models.biomarker_series import BiomarkerPoint
 from app.schemas.patient import PatientCreate, Patient as PatientSchema, PatientUpdate
+from app.schemas.series import BiomarkerMetric, BiomarkerSeries, DownsampleMethod
+from app.services.timeseries import lttb, minmax
+from app.routers.projection import Fields, FieldSelector, select_fields, fetch_all, fetch_first, project
 
 router = APIRouter()
 
 
 @router.post("/", response_model=PatientSchema)
-async def create_patient(patient: PatientCreate, db: AsyncSession = Depends(get_db)):
+async def create_patient(patient: PatientCreate, db: AsyncSession = Depends(get_write_db)):
     db_patient = Patient(**patient.model_dump())
     db.add(db_patient)
     await db.commit()
@@ -21,24 +25,64 @@ async def create_patient(patient: PatientCreate, db: AsyncSession = Depends(get_
 
 
 @router.get("/", response_model=List[PatientSchema])
-async def read_patients(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Patient).offset(skip).limit(limit))
-    patients = result.scalars().all()
-    return patients
+async def read_patients(
+    skip: int = 0,
+    limit: int = 100,
+    fields: Fields = Depends(FieldSelector(PatientSchema)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    result = await db.execute(select_fields(Patient, fields).offset(skip).limit(limit))
+    patients = fetch_all(result, fields)
+    return project(PatientSchema, fields, patients)
 
 
 @router.get("/{patient_id}", response_model=PatientSchema)
-async def read_patient(patient_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Patient).filter(Patient.id == patient_id))
-    patient = result.scalars().first()
+async def read_patient(
+    patient_id: int,
+    fields: Fields = Depends(FieldSelector(PatientSchema)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    result = await db.execute(select_fields(Patient, fields).filter(Patient.id == patient_id))
+    patient = fetch_first(result, fields)
     if patient is None:
         raise HTTPException(status_code=404, detail="Patient not found")
-    return patient
+    return project(PatientSchema, fields, patient)
+
+
+@router.get("/{patient_id}/series", response_model=BiomarkerSeries)
+async def read_patient_series(
+    patient_id: int,
+    metric: BiomarkerMetric,
+    points: int = Query(200, ge=3, le=5000),
+    method: DownsampleMethod = DownsampleMethod.lttb,
+    db: AsyncSession = Depends(get_read_db),
+):
+    result = await db.execute(select(Patient.id).filter(Patient.id == patient_id))
+    if result.scalar() is None:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    
+    result = await db.execute(
+        select(BiomarkerPoint.recorded_on, BiomarkerPoint.value)
+        .filter(BiomarkerPoint.patient_id == patient_id, BiomarkerPoint.metric == metric.value)
+        .order_by(BiomarkerPoint.recorded_on, BiomarkerPoint.id)
+    )
+    series = [tuple(row) for row in result.all()]
+    
+    downsample = lttb if method == DownsampleMethod.lttb else minmax
+    sampled = downsample(series, points)
+    
+    return BiomarkerSeries(
+        patient_id=patient_id,
+        metric=metric,
+        method=method,
+        total_points=len(series),
+        points=[{"recorded_on": d, "value": v} for d, v in sampled],
+    )
 
 
 @router.patch("/{patient_id}", response_model=PatientSchema)
 async def update_patient(
-    patient_id: int, patient_update: PatientUpdate, db: AsyncSession = Depends(get_db)
+    patient_id: int, patient_update: PatientUpdate, db: AsyncSession = Depends(get_write_db)
 ):
     # Filter out None values
     update_data = {k: v for k, v in patient_update.model_dump().items() if v is not None}
@@ -67,7 +111,7 @@ async def update_patient(
 
 
 @router.delete("/{patient_id}")
-async def delete_patient(patient_id: int, db: AsyncSession = Depends(get_db)):
+async def delete_patient(patient_id: int, db: AsyncSession = Depends(get_write_db)):
     result = await db.execute(select(Patient).filter(Patient.id == patient_id))
     patient = result.scalars().first()
     if patient is None:
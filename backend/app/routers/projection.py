@@ -0,0 +1,72 @@
+"""Sparse field selection (``?fields=id,first_name``) for read endpoints.
+
+The requested fields are pushed down into the SELECT column list and the
+rows are serialised with a response model containing only those fields.
+Models are built once per (schema, field set) and cached.
+"""
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple, Type, Union
+
+from fastapi import HTTPException, Query
+from fastapi.responses import Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy.engine import Result
+from sqlalchemy.future import select
+
+Fields = Optional[Tuple[str, ...]]
+
+
+class FieldSelector:
+    """Dependency parsing the comma-separated ``fields`` query parameter against a schema"""
+
+    def __init__(self, schema: Type[BaseModel]):
+        self.schema = schema
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
+    ) -> Fields:
+        if not fields:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested - set(self.schema.model_fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        # Schema order keeps the cache key stable for any ordering of the request
+        return tuple(name for name in self.schema.model_fields if name in requested)
+
+
+@lru_cache(maxsize=256)
+def projection_adapter(schema: Type[BaseModel], fields: Tuple[str, ...], many: bool) -> TypeAdapter:
+    model = create_model(
+        f"{schema.__name__}Projection",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields},
+    )
+    return TypeAdapter(List[model] if many else model)
+
+
+def select_fields(model: Any, fields: Fields):
+    """SELECT of the whole entity, or only the requested columns"""
+    if fields is None:
+        return select(model)
+    return select(*(getattr(model, name) for name in fields))
+
+
+def fetch_all(result: Result, fields: Fields) -> List[Any]:
+    return result.scalars().all() if fields is None else result.all()
+
+
+def fetch_first(result: Result, fields: Fields) -> Any:
+    return result.scalars().first() if fields is None else result.first()
+
+
+def project(schema: Type[BaseModel], fields: Fields, data: Union[Any, List[Any]]) -> Any:
+    """Serialise projected rows directly; full entities go through response_model as usual"""
+    if fields is None:
+        return data
+    adapter = projection_adapter(schema, fields, isinstance(data, list))
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(data, from_attributes=True)),
+        media_type="application/json",
+    )
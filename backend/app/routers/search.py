@@ -0,0 +1,21 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_db
+from app.schemas.search import SearchHit, SearchKind
+from app.services.search import search
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[SearchHit])
+async def search_records(
+    q: str = Query(..., min_length=1),
+    kind: Optional[SearchKind] = None,
+    skip: int = 0,
+    limit: int = Query(20, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Search patients by partial name/email and assessments/treatments by notes"""
+    return await search(db, q, kind=kind.value if kind else None, skip=skip, limit=limit)
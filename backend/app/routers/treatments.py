@@ -1,18 +1,21 @@
-from typing import List
+from datetime import date
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import update, delete
 
-from app.database import get_db
+from app.database import get_read_db, get_write_db
 from app.models.treatment import Treatment
 from app.schemas.treatment import TreatmentCreate, Treatment as TreatmentSchema, TreatmentUpdate
+from app.routers.projection import Fields, FieldSelector, select_fields, fetch_first, project
+from app.services.archive import treatment_criteria, is_archived, reaches_archive, read_archived, tiered_select
 
 router = APIRouter()
 
 
 @router.post("/", response_model=TreatmentSchema)
-async def create_treatment(treatment: TreatmentCreate, db: AsyncSession = Depends(get_db)):
+async def create_treatment(treatment: TreatmentCreate, db: AsyncSession = Depends(get_write_db)):
     db_treatment = Treatment(**treatment.model_dump())
     db.add(db_treatment)
     await db.commit()
@@ -21,31 +24,65 @@ async def create_treatment(treatment: TreatmentCreate, db: AsyncSession = Depend
 
 
 @router.get("/", response_model=List[TreatmentSchema])
-async def read_treatments(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Treatment).offset(skip).limit(limit))
-    treatments = result.scalars().all()
-    return treatments
+async def read_treatments(
+    skip: int = 0,
+    limit: int = 100,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    fields: Fields = Depends(FieldSelector(TreatmentSchema)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """All history by default; archived treatments are skipped when from_date is after the watermark"""
+    criteria = treatment_criteria(from_date=from_date, to_date=to_date)
+    include_archive = await reaches_archive(db, "treatments", from_date)
+    result = await db.execute(
+        tiered_select(Treatment, fields, criteria, include_archive).offset(skip).limit(limit)
+    )
+    treatments = result.all()
+    return project(TreatmentSchema, fields, treatments)
 
 
 @router.get("/patient/{patient_id}", response_model=List[TreatmentSchema])
-async def read_patient_treatments(patient_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Treatment).filter(Treatment.patient_id == patient_id))
-    treatments = result.scalars().all()
-    return treatments
+async def read_patient_treatments(
+    patient_id: int,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    fields: Fields = Depends(FieldSelector(TreatmentSchema)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """All history by default; archived treatments are skipped when from_date is after the watermark"""
+    criteria = treatment_criteria(patient_id=patient_id, from_date=from_date, to_date=to_date)
+    include_archive = await reaches_archive(db, "treatments", from_date)
+    result = await db.execute(tiered_select(Treatment, fields, criteria, include_archive))
+    treatments = result.all()
+    return project(TreatmentSchema, fields, treatments)
+
+
+async def _missing(db: AsyncSession, treatment_id: int) -> HTTPException:
+    """404, or 409 for an archived treatment, which is read-only"""
+    if await is_archived(db, "treatments", treatment_id):
+        return HTTPException(status_code=409, detail="Treatment is archived and read-only")
+    return HTTPException(status_code=404, detail="Treatment not found")
 
 
 @router.get("/{treatment_id}", response_model=TreatmentSchema)
-async def read_treatment(treatment_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Treatment).filter(Treatment.id == treatment_id))
-    treatment = result.scalars().first()
+async def read_treatment(
+    treatment_id: int,
+    fields: Fields = Depends(FieldSelector(TreatmentSchema)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    result = await db.execute(select_fields(Treatment, fields).filter(Treatment.id == treatment_id))
+    treatment = fetch_first(result, fields)
+    if treatment is None:
+        treatment = await read_archived(db, "treatments", treatment_id, fields)
     if treatment is None:
         raise HTTPException(status_code=404, detail="Treatment not found")
-    return treatment
+    return project(TreatmentSchema, fields, treatment)
 
 
 @router.patch("/{treatment_id}", response_model=TreatmentSchema)
 async def update_treatment(
-    treatment_id: int, treatment_update: TreatmentUpdate, db: AsyncSession = Depends(get_db)
+    treatment_id: int, treatment_update: TreatmentUpdate, db: AsyncSession = Depends(get_write_db)
 ):
     # Filter out None values
     update_data = {k: v for k, v in treatment_update.model_dump().items() if v is not None}
@@ -55,7 +92,7 @@ async def update_treatment(
         result = await db.execute(select(Treatment).filter(Treatment.id == treatment_id))
         treatment = result.scalars().first()
         if treatment is None:
-            raise HTTPException(status_code=404, detail="Treatment not found")
+            raise await _missing(db, treatment_id)
         return treatment
     
     # Update treatment
@@ -68,17 +105,17 @@ async def update_treatment(
     result = await db.execute(select(Treatment).filter(Treatment.id == treatment_id))
     updated_treatment = result.scalars().first()
     if updated_treatment is None:
-        raise HTTPException(status_code=404, detail="Treatment not found")
+        raise await _missing(db, treatment_id)
     
     return updated_treatment
 
 
 @router.delete("/{treatment_id}")
-async def delete_treatment(treatment_id: int, db: AsyncSession = Depends(get_db)):
+async def delete_treatment(treatment_id: int, db: AsyncSession = Depends(get_write_db)):
     result = await db.execute(select(Treatment).filter(Treatment.id == treatment_id))
     treatment = result.scalars().first()
     if treatment is None:
-        raise HTTPException(status_code=404, detail="Treatment not found")
+        raise await _missing(db, treatment_id)
     
     await db.execute(delete(Treatment).where(Treatment.id == treatment_id))
     await db.commit()
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+
+class FmriFeature(BaseModel):
+    id: int
+    assessment_id: int
+    patient_id: int
+    ecn_mean_activation: Optional[float] = None
+    ecn_peak_activation: Optional[float] = None
+    n_back_load_effect: Optional[float] = None
+    ecn_mean_connectivity: Optional[float] = None
+    ecn_region_count: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
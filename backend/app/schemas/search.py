@@ -0,0 +1,16 @@
+from enum import Enum
+from pydantic import BaseModel
+
+
+class SearchKind(str, Enum):
+    patient = "patient"
+    assessment = "assessment"
+    treatment = "treatment"
+
+
+class SearchHit(BaseModel):
+    kind: SearchKind
+    id: int
+    patient_id: int
+    snippet: str
+    rank: float
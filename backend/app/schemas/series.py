@@ -0,0 +1,30 @@
+from datetime import date
+from enum import Enum
+from typing import List
+from pydantic import BaseModel
+
+
+class BiomarkerMetric(str, Enum):
+    crp_level = "crp_level"
+    il6_level = "il6_level"
+    tnf_alpha_level = "tnf_alpha_level"
+    n_back_task_score = "n_back_task_score"
+    wpai_score = "wpai_score"
+
+
+class DownsampleMethod(str, Enum):
+    lttb = "lttb"  # Largest-Triangle-Three-Buckets, preserves visual shape
+    minmax = "minmax"  # Min and max of each bucket, preserves extremes
+
+
+class SeriesPoint(BaseModel):
+    recorded_on: date
+    value: float
+
+
+class BiomarkerSeries(BaseModel):
+    patient_id: int
+    metric: BiomarkerMetric
+    method: DownsampleMethod
+    total_points: int
+    points: List[SeriesPoint]
@@ -0,0 +1,16 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel
+
+
+class SnapshotRequest(BaseModel):
+    tables: Optional[List[Literal["patients", "assessments", "treatments"]]] = None
+    format: Literal["parquet", "arrow"] = "parquet"
+    fmri: Literal["json", "flatten"] = "json"
+    full: bool = False
+
+
+class SnapshotPart(BaseModel):
+    table: str
+    file: Optional[str] = None
+    rows: int
+    since_id: int
@@ -0,0 +1,203 @@
+"""Hot/cold tiering of historical assessments and treatments.
+
+Rows older than a cutoff are moved, in batches of one transaction each,
+from the hot tables into ``assessments_archive`` / ``treatments_archive``:
+
+- assessments whose ``assessment_date`` is before the cutoff
+- inactive treatments whose ``end_date`` is before the cutoff
+
+The cutoff is recorded as the table's watermark before the first batch
+moves, so readers always know which date ranges may involve the archive.
+Read endpoints only query an archive table when the requested date range
+starts before its watermark, so ``from_date`` keeps recent-data queries on
+the hot tables. Archived rows are read-only. Biomarker series points and fMRI features stay
+in place, and on SQLite archived notes stay searchable::
+
+    python -m app.services.archive --before 2023-01-01 --batch-size 1000 --pause 0.1
+"""
+import argparse
+import asyncio
+import os
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import and_, delete, or_, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql.schema import Table
+
+from app.models.archive import ArchiveWatermark, assessments_archive, treatments_archive
+from app.models.assessment import Assessment
+from app.models.search import SEARCH_KINDS
+from app.models.treatment import Treatment
+
+ARCHIVE_TABLES: Dict[str, Table] = {
+    "assessments": assessments_archive,
+    "treatments": treatments_archive,
+}
+
+# Which hot rows are cold relative to a cutoff date
+ARCHIVE_POLICIES: Dict[str, Callable[[date], Any]] = {
+    "assessments": lambda cutoff: Assessment.assessment_date < cutoff,
+    "treatments": lambda cutoff: and_(Treatment.is_active.is_(False), Treatment.end_date < cutoff),
+}
+
+ARCHIVE_MODELS = {"assessments": Assessment, "treatments": Treatment}
+
+# Criteria builder applied to both the hot table and its archive
+Criteria = Callable[[Table], List[Any]]
+
+
+async def archive_watermark(db: AsyncSession, table_name: str) -> Optional[date]:
+    result = await db.execute(
+        select(ArchiveWatermark.archived_before).filter(ArchiveWatermark.table_name == table_name)
+    )
+    return result.scalar()
+
+
+async def reaches_archive(db: AsyncSession, table_name: str, from_date: Optional[date]) -> bool:
+    """Whether a date range starting at ``from_date`` (None: all history) may include archived rows"""
+    watermark = await archive_watermark(db, table_name)
+    if watermark is None:
+        return False
+    return from_date is None or from_date < watermark
+
+
+def tiered_select(
+    model: Any, fields: Optional[Sequence[str]], criteria: Criteria, include_archive: bool
+):
+    """SELECT the requested columns from the hot table, plus the archive if needed, by id"""
+    table = model.__table__
+    names = list(fields or [c.name for c in table.columns])
+    if not include_archive:
+        return select(*(table.c[name] for name in names)).where(*criteria(table)).order_by(table.c.id)
+
+    # The union is ordered by id even when the caller did not ask for it
+    inner = names if "id" in names else names + ["id"]
+    archive = ARCHIVE_TABLES[table.name]
+    hot = select(*(table.c[name] for name in inner)).where(*criteria(table))
+    cold = select(*(archive.c[name] for name in inner)).where(*criteria(archive))
+    combined = union_all(hot, cold).subquery()
+    return select(*(combined.c[name] for name in names)).order_by(combined.c.id)
+
+
+def assessment_criteria(
+    patient_id: Optional[int] = None, from_date: Optional[date] = None, to_date: Optional[date] = None
+) -> Criteria:
+    def build(table: Table) -> List[Any]:
+        criteria = []
+        if patient_id is not None:
+            criteria.append(table.c.patient_id == patient_id)
+        if from_date is not None:
+            criteria.append(table.c.assessment_date >= from_date)
+        if to_date is not None:
+            criteria.append(table.c.assessment_date <= to_date)
+        return criteria
+    return build
+
+
+def treatment_criteria(
+    patient_id: Optional[int] = None, from_date: Optional[date] = None, to_date: Optional[date] = None
+) -> Criteria:
+    """Treatments overlapping the [from_date, to_date] range"""
+    def build(table: Table) -> List[Any]:
+        criteria = []
+        if patient_id is not None:
+            criteria.append(table.c.patient_id == patient_id)
+        if from_date is not None:
+            criteria.append(or_(table.c.end_date.is_(None), table.c.end_date >= from_date))
+        if to_date is not None:
+            criteria.append(table.c.start_date <= to_date)
+        return criteria
+    return build
+
+
+async def read_archived(
+    db: AsyncSession, table_name: str, row_id: int, fields: Optional[Sequence[str]] = None
+):
+    """Look a row up in the archive after a miss on the hot table"""
+    archive = ARCHIVE_TABLES[table_name]
+    model = ARCHIVE_MODELS[table_name]
+    names = fields or [c.name for c in model.__table__.columns]
+    result = await db.execute(select(*(archive.c[name] for name in names)).where(archive.c.id == row_id))
+    return result.first()
+
+
+async def is_archived(db: AsyncSession, table_name: str, row_id: int) -> bool:
+    archive = ARCHIVE_TABLES[table_name]
+    result = await db.execute(select(archive.c.id).where(archive.c.id == row_id))
+    return result.first() is not None
+
+
+async def _raise_watermark(db: AsyncSession, table_name: str, cutoff: date) -> None:
+    watermark = await db.get(ArchiveWatermark, table_name)
+    if watermark is None:
+        db.add(ArchiveWatermark(table_name=table_name, archived_before=cutoff))
+    elif watermark.archived_before < cutoff:
+        watermark.archived_before = cutoff
+    await db.commit()
+
+
+async def archive_table(
+    db: AsyncSession, table_name: str, cutoff: date, batch_size: int = 1000, pause: float = 0.0
+) -> int:
+    """Move cold rows of one table into its archive; returns the number moved"""
+    model = ARCHIVE_MODELS[table_name]
+    archive = ARCHIVE_TABLES[table_name]
+    policy = ARCHIVE_POLICIES[table_name]
+    columns = [c.name for c in model.__table__.columns]
+    search_kind = SEARCH_KINDS[table_name[:-1]]
+    sqlite = db.bind.dialect.name == "sqlite"
+
+    await _raise_watermark(db, table_name, cutoff)
+
+    moved = 0
+    while True:
+        result = await db.execute(select(model.id).where(policy(cutoff)).order_by(model.id).limit(batch_size))
+        ids = result.scalars().all()
+        if not ids:
+            return moved
+
+        await db.execute(
+            archive.insert().from_select(columns, select(model.__table__).where(model.id.in_(ids)))
+        )
+        await db.execute(delete(model).where(model.id.in_(ids)))
+        if sqlite:
+            # The hot table's delete trigger dropped these notes from the search index
+            await db.execute(
+                text(
+                    f"INSERT INTO search_index(rowid, body, patient_id) "
+                    f"SELECT id * 4 + {search_kind}, notes, patient_id FROM {archive.name} "
+                    f"WHERE notes IS NOT NULL AND id IN ({', '.join(str(i) for i in ids)})"
+                )
+            )
+        await db.commit()
+        moved += len(ids)
+        if pause:
+            # Give concurrent API transactions a chance at the write lock
+            await asyncio.sleep(pause)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from app.database import SessionLocal
+
+    cutoff = args.before or date.today() - timedelta(days=args.after_days)
+    async with SessionLocal() as db:
+        for table_name in args.tables:
+            moved = await archive_table(db, table_name, cutoff, args.batch_size, args.pause)
+            print(f"{table_name}: archived {moved} rows dated before {cutoff}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move historical assessments and treatments to archive tables")
+    parser.add_argument("--before", type=date.fromisoformat, help="Cutoff date (YYYY-MM-DD)")
+    parser.add_argument(
+        "--after-days",
+        type=int,
+        default=int(os.getenv("ARCHIVE_AFTER_DAYS", 730)),
+        help="Cutoff as an age in days, used when --before is not given",
+    )
+    parser.add_argument("--tables", nargs="+", choices=list(ARCHIVE_TABLES), default=list(ARCHIVE_TABLES))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,304 @@
+"""Batched online backfills for data migrations.
+
+A backfill walks one table in key order, ``chunk_size`` keys at a time,
+and hands each chunk to a processing function. Every chunk runs in its own
+short transaction and is committed together with the worker's checkpoint in
+``backfill_checkpoints``. As a result:
+
+- the API keeps serving between chunks. ``pause`` and ``duty_cycle`` limit
+  how much of the time the backfill holds the database's write lock;
+- an interrupted backfill resumes after its last committed chunk;
+- several workers can share a backfill. Each owns a contiguous key range,
+  fixed when the backfill is first planned. The last range is open ended,
+  so rows inserted while the backfill runs are covered up to completion.
+  Later writes must be handled by the application itself.
+
+Processing functions receive a synchronous ``Connection`` and the chunk's
+keys. The same backfill therefore runs from an Alembic ``upgrade()`` with
+``run_in_migration`` or online from the command line::
+
+    python -m app.services.backfill fmri_features --workers 4 --pause 0.05
+    python -m app.services.backfill fmri_features --status
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.future import select
+from sqlalchemy.sql.schema import Table
+
+from app.models.backfill_checkpoint import BackfillCheckpoint
+
+# name: "module:attribute" of the Backfill, imported on demand
+BACKFILLS: Dict[str, str] = {
+    "fmri_features": "app.services.fmri_features:fmri_features_backfill",
+}
+
+checkpoints = BackfillCheckpoint.__table__
+
+# Processes one chunk of keys within the chunk's transaction
+Process = Callable[[Connection, List[int]], None]
+
+
+class BackfillError(Exception):
+    """Raised when a backfill is unknown or its plan does not match the request"""
+
+
+class Backfill:
+    """A chunked data migration over the rows of ``table`` matching ``where``"""
+
+    def __init__(
+        self,
+        name: str,
+        table: Table,
+        process: Process,
+        where: Optional[Any] = None,
+        key: str = "id",
+        chunk_size: int = 500,
+    ):
+        self.name = name
+        self.table = table
+        self.process = process
+        self.where = where
+        self.key = table.c[key]
+        self.chunk_size = chunk_size
+
+    def criteria(self, after: int, upto: Optional[int] = None) -> List[Any]:
+        criteria = [self.key > after]
+        if upto is not None:
+            criteria.append(self.key <= upto)
+        if self.where is not None:
+            criteria.append(self.where)
+        return criteria
+
+
+def check_duty_cycle(duty_cycle: float) -> float:
+    if not 0 < duty_cycle <= 1:
+        raise ValueError(f"duty_cycle must be in (0, 1], got {duty_cycle}")
+    return duty_cycle
+
+
+def _duty_cycle_arg(value: str) -> float:
+    try:
+        return check_duty_cycle(float(value))
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+
+
+def load_backfill(name: str) -> Backfill:
+    if name not in BACKFILLS:
+        raise BackfillError(f"Unknown backfill: {name}")
+    module, attribute = BACKFILLS[name].split(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+def _plan(connection: Connection, name: str) -> List[Any]:
+    result = connection.execute(
+        select(checkpoints).where(checkpoints.c.name == name).order_by(checkpoints.c.worker)
+    )
+    return result.all()
+
+
+def plan_backfill(connection: Connection, backfill: Backfill, workers: Optional[int] = None) -> List[Any]:
+    """Split the key space between ``workers`` on the first run; returns the checkpoints.
+
+    An existing plan is kept, so that resumed workers continue their own
+    ranges. ``workers=None`` accepts whatever plan exists, or plans a single
+    worker.
+    """
+    plan = _plan(connection, backfill.name)
+    if plan:
+        if workers is not None and plan[0].workers != workers:
+            raise BackfillError(
+                f"Backfill {backfill.name} was planned for {plan[0].workers} workers; "
+                f"resume with that many or restart it"
+            )
+        connection.commit()
+        return plan
+
+    workers = workers or 1
+    query = select(func.min(backfill.key), func.max(backfill.key))
+    if backfill.where is not None:
+        query = query.where(backfill.where)
+    low, high = connection.execute(query).one()
+    if low is None:
+        low = high = 0
+    # Equal key spans; the last range stays open for rows inserted meanwhile
+    span = (high - low + 1) / workers
+    bounds = [low - 1 + round(span * worker) for worker in range(workers)] + [None]
+    connection.execute(
+        insert(checkpoints),
+        [
+            {
+                "name": backfill.name,
+                "worker": worker,
+                "workers": workers,
+                "start_key": bounds[worker],
+                "end_key": bounds[worker + 1],
+                "last_key": bounds[worker],
+                "rows_processed": 0,
+            }
+            for worker in range(workers)
+        ],
+    )
+    connection.commit()
+    return _plan(connection, backfill.name)
+
+
+def reset_backfill(connection: Connection, name: str) -> None:
+    """Forget a backfill's progress so that it starts over"""
+    connection.execute(delete(checkpoints).where(checkpoints.c.name == name))
+    connection.commit()
+
+
+def run_worker(
+    connection: Connection,
+    backfill: Backfill,
+    worker: int = 0,
+    chunk_size: Optional[int] = None,
+    pause: float = 0.0,
+    duty_cycle: float = 1.0,
+) -> int:
+    """Process one worker's key range from its checkpoint; returns the rows processed.
+
+    After each chunk the worker sleeps ``pause`` seconds plus whatever keeps
+    its share of wall-clock time in transactions at ``duty_cycle``, which
+    must be in (0, 1].
+    """
+    check_duty_cycle(duty_cycle)
+    chunk_size = chunk_size or backfill.chunk_size
+    result = connection.execute(
+        select(checkpoints).where(checkpoints.c.name == backfill.name, checkpoints.c.worker == worker)
+    )
+    checkpoint = result.first()
+    connection.commit()
+    if checkpoint is None:
+        raise BackfillError(f"Backfill {backfill.name} has no worker {worker}; plan it first")
+    if checkpoint.completed_at is not None:
+        return 0
+
+    last_key = checkpoint.last_key
+    processed = 0
+    while True:
+        started = time.monotonic()
+        result = connection.execute(
+            select(backfill.key)
+            .where(*backfill.criteria(last_key, checkpoint.end_key))
+            .order_by(backfill.key)
+            .limit(chunk_size)
+        )
+        keys = result.scalars().all()
+        if keys:
+            backfill.process(connection, keys)
+            last_key = keys[-1]
+        values = {"last_key": last_key, "rows_processed": checkpoints.c.rows_processed + len(keys)}
+        if len(keys) < chunk_size:
+            values["completed_at"] = func.now()
+        connection.execute(update(checkpoints).where(checkpoints.c.id == checkpoint.id).values(**values))
+        connection.commit()
+        processed += len(keys)
+        if len(keys) < chunk_size:
+            return processed
+
+        elapsed = time.monotonic() - started
+        delay = pause + elapsed * (1 - duty_cycle) / duty_cycle
+        if delay > 0:
+            time.sleep(delay)
+
+
+def run_in_migration(name: str, pause: float = 0.0, duty_cycle: float = 1.0) -> None:
+    """Run a backfill from an Alembic ``upgrade()``, chunk by chunk.
+
+    The migration's pending transaction is committed first, so the new
+    schema is visible and no lock is held across the whole backfill. With
+    ``BACKFILL_DEFER=1`` the backfill is skipped, to be run online with the
+    command line once the migration has been deployed.
+    """
+    from alembic import op
+
+    check_duty_cycle(duty_cycle)
+    backfill = load_backfill(name)
+    if os.getenv("BACKFILL_DEFER"):
+        print(f"Deferred backfill {name}; run: python -m app.services.backfill {name}")
+        return
+
+    with op.get_context().autocommit_block():
+        with op.get_bind().engine.connect() as connection:
+            for checkpoint in plan_backfill(connection, backfill):
+                run_worker(connection, backfill, checkpoint.worker, pause=pause, duty_cycle=duty_cycle)
+
+
+async def _run_worker(args: argparse.Namespace, worker: int) -> int:
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from app.database import DATABASE_URL
+
+    # Workers may run in forked processes, so each gets its own engine
+    engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+    try:
+        async with engine.connect() as connection:
+            return await connection.run_sync(
+                run_worker, load_backfill(args.name), worker, args.chunk_size, args.pause, args.duty_cycle
+            )
+    finally:
+        await engine.dispose()
+
+
+def _worker_process(args: argparse.Namespace, worker: int) -> int:
+    return asyncio.run(_run_worker(args, worker))
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from app.database import engine
+
+    backfill = load_backfill(args.name)
+    async with engine.connect() as connection:
+        if args.restart:
+            await connection.run_sync(reset_backfill, args.name)
+        if args.status:
+            plan = await connection.run_sync(_plan, args.name)
+        else:
+            plan = await connection.run_sync(plan_backfill, backfill, args.workers)
+    await engine.dispose()
+
+    if args.status:
+        for checkpoint in plan:
+            state = "done" if checkpoint.completed_at else f"at key {checkpoint.last_key}"
+            print(f"worker {checkpoint.worker}: {checkpoint.rows_processed} rows, {state}")
+        return
+
+    workers = [args.worker] if args.worker is not None else [checkpoint.worker for checkpoint in plan]
+    if len(workers) == 1:
+        processed = [await _run_worker(args, workers[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=len(workers)) as executor:
+            loop = asyncio.get_running_loop()
+            processed = await asyncio.gather(
+                *(loop.run_in_executor(executor, _worker_process, args, worker) for worker in workers)
+            )
+    print(f"{args.name}: processed {sum(processed)} rows with {len(workers)} worker(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a batched, resumable data backfill")
+    parser.add_argument("name", choices=list(BACKFILLS))
+    parser.add_argument("--workers", type=int, help="Split a new backfill between this many worker processes")
+    parser.add_argument("--worker", type=int, help="Only run this worker's range, e.g. one per host")
+    parser.add_argument("--chunk-size", type=int, help="Keys per transaction (default: the backfill's own)")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between chunks")
+    parser.add_argument(
+        "--duty-cycle",
+        type=_duty_cycle_arg,
+        default=1.0,
+        help="Fraction of time spent in transactions, in (0, 1]; e.g. 0.5 sleeps as long as each chunk took",
+    )
+    parser.add_argument("--restart", action="store_true", help="Discard previous progress")
+    parser.add_argument("--status", action="store_true", help="Show progress and exit")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,143 @@
+"""Extraction of executive control network (ECN) features from fMRI payloads.
+
+``Assessment.fmri_data`` is free-form JSON. The extractor understands the
+following keys and ignores anything else:
+
+- ``ecn_activation``: N-back contrast betas per ECN region, either as a
+  ``{region: beta}`` mapping or a plain list.
+- ``ecn_timeseries``: per-region BOLD time courses (regions x timepoints),
+  used to compute the region-by-region correlation matrix.
+- ``connectivity_matrix``: a precomputed square region-by-region matrix,
+  used when no time courses are supplied.
+- ``n_back_activation``: mean ECN activation per working-memory load, e.g.
+  ``{"0-back": 0.2, "2-back": 0.9}``.
+
+Features are written on every assessment write; rows created before the
+pipeline existed are filled in by the ``fmri_features`` backfill::
+
+    python -m app.services.backfill fmri_features
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.assessment import Assessment
+from app.models.fmri_feature import FmriFeature
+from app.services.backfill import Backfill
+
+
+def _as_vector(value: Any) -> Optional[np.ndarray]:
+    if isinstance(value, dict):
+        value = list(value.values())
+    try:
+        vector = np.asarray(value, dtype=float).ravel()
+    except (TypeError, ValueError):
+        return None
+    vector = vector[np.isfinite(vector)]
+    return vector if vector.size else None
+
+
+def _as_matrix(value: Any) -> Optional[np.ndarray]:
+    try:
+        matrix = np.asarray(value, dtype=float)
+    except (TypeError, ValueError):
+        return None
+    if matrix.ndim != 2 or matrix.shape[0] < 2:
+        return None
+    return matrix
+
+
+def _load_order(label: str) -> float:
+    match = re.search(r"\d+(\.\d+)?", str(label))
+    return float(match.group()) if match else float("inf")
+
+
+def extract_ecn_features(fmri_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Compute ECN summary features from an fMRI payload.
+
+    Returns None when the payload contains nothing the extractor understands.
+    """
+    if not isinstance(fmri_data, dict):
+        return None
+
+    features: Dict[str, Any] = {}
+
+    activation = _as_vector(fmri_data.get("ecn_activation"))
+    if activation is not None:
+        features["ecn_mean_activation"] = float(activation.mean())
+        features["ecn_peak_activation"] = float(activation.max())
+
+    connectivity = None
+    timeseries = _as_matrix(fmri_data.get("ecn_timeseries"))
+    if timeseries is not None and timeseries.shape[1] > 1:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            connectivity = np.corrcoef(timeseries)
+    else:
+        matrix = _as_matrix(fmri_data.get("connectivity_matrix"))
+        if matrix is not None and matrix.shape[0] == matrix.shape[1]:
+            connectivity = matrix
+    if connectivity is not None:
+        # Mean of the off-diagonal correlations between ECN regions
+        upper = connectivity[np.triu_indices_from(connectivity, k=1)]
+        upper = upper[np.isfinite(upper)]
+        if upper.size:
+            features["ecn_mean_connectivity"] = float(upper.mean())
+            features["ecn_region_count"] = int(connectivity.shape[0])
+
+    loads = fmri_data.get("n_back_activation")
+    if isinstance(loads, dict) and len(loads) >= 2:
+        ordered = sorted(loads.items(), key=lambda item: _load_order(item[0]))
+        values = _as_vector([value for _, value in ordered])
+        if values is not None and values.size == len(ordered):
+            features["n_back_load_effect"] = float(values[-1] - values[0])
+
+    return features or None
+
+
+def build_fmri_feature(assessment: Assessment) -> Optional[FmriFeature]:
+    """Feature row for an assessment, or None if its payload has no ECN data"""
+    features = extract_ecn_features(assessment.fmri_data)
+    if features is None:
+        return None
+    return FmriFeature(assessment_id=assessment.id, patient_id=assessment.patient_id, **features)
+
+
+async def sync_fmri_features(db: AsyncSession, assessment: Assessment) -> None:
+    """Recompute the feature row for an assessment within the caller's transaction"""
+    await clear_fmri_features(db, assessment.id)
+    feature = build_fmri_feature(assessment)
+    if feature is not None:
+        db.add(feature)
+
+
+async def clear_fmri_features(db: AsyncSession, assessment_id: int) -> None:
+    """Remove the feature row derived from an assessment"""
+    await db.execute(delete(FmriFeature).where(FmriFeature.assessment_id == assessment_id))
+
+
+def _backfill_chunk(connection: Connection, ids: List[int]) -> None:
+    """Recompute the feature rows of a chunk of assessments"""
+    result = connection.execute(
+        select(Assessment.id, Assessment.patient_id, Assessment.fmri_data).filter(Assessment.id.in_(ids))
+    )
+    features = []
+    for assessment_id, patient_id, fmri_data in result:
+        extracted = extract_ecn_features(fmri_data)
+        if extracted is not None:
+            features.append({"assessment_id": assessment_id, "patient_id": patient_id, **extracted})
+    connection.execute(delete(FmriFeature).where(FmriFeature.assessment_id.in_(ids)))
+    if features:
+        connection.execute(insert(FmriFeature), features)
+
+
+fmri_features_backfill = Backfill(
+    "fmri_features",
+    Assessment.__table__,
+    _backfill_chunk,
+    where=Assessment.fmri_data.isnot(None),
+)
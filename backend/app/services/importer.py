@@ -0,0 +1,332 @@
+"""Bulk import of historical assessments and treatments from CSV or NDJSON.
+
+Files are streamed in chunks of ``chunk_size`` records. Each chunk is
+validated against the same Pydantic schemas as the API (``AssessmentCreate``
+/ ``TreatmentCreate``) in a process pool, then written in one transaction
+together with the import checkpoint. Because the checkpoint and the rows
+commit atomically, an interrupted import resumes from the last committed
+chunk without inserting duplicates; re-running an import against a file
+that has grown only loads the appended records.
+
+Rows identify their patient either by ``patient_id`` or by
+``patient_email``. Rows that fail validation or name an unknown patient
+are written to ``<file>.rejects.ndjson`` before their chunk commits, and
+are counted on the checkpoint::
+
+    python -m app.services.importer assessments trial_a/assessments.csv --workers 4
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.assessment import Assessment
+from app.models.import_checkpoint import ImportCheckpoint
+from app.models.patient import Patient
+from app.models.treatment import Treatment
+from app.schemas.assessment import AssessmentCreate
+from app.schemas.treatment import TreatmentCreate
+from app.services.fmri_features import build_fmri_feature
+from app.services.timeseries import build_series_points
+
+IMPORT_KINDS = {
+    "assessments": (Assessment, AssessmentCreate),
+    "treatments": (Treatment, TreatmentCreate),
+}
+
+# (record number, raw field mapping) as read from the file
+Record = Tuple[int, Optional[Dict[str, Any]]]
+# (record number, error message)
+Rejection = Tuple[int, str]
+
+
+def _iter_records(path: Path, start_offset: int) -> Iterator[Tuple[Optional[Dict[str, Any]], int]]:
+    """Yield each record with the byte offset just past it; malformed NDJSON lines yield None"""
+    with open(path, "rb") as f:
+        if path.suffix.lower() == ".csv":
+            header = next(csv.reader([f.readline().decode("utf-8-sig")]))
+            offset = max(start_offset, f.tell())
+            f.seek(offset)
+
+            def lines() -> Iterator[str]:
+                nonlocal offset
+                for line in iter(f.readline, b""):
+                    offset += len(line)
+                    yield line.decode("utf-8")
+
+            # csv.reader pulls lines lazily, so offset always ends on a record boundary
+            for row in csv.reader(lines()):
+                if row:
+                    yield dict(zip(header, row)), offset
+        else:
+            f.seek(start_offset)
+            offset = start_offset
+            for line in iter(f.readline, b""):
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                yield (record if isinstance(record, dict) else None), offset
+
+
+def _iter_chunks(
+    path: Path, start_offset: int, first_number: int, chunk_size: int
+) -> Iterator[Tuple[List[Record], int]]:
+    chunk: List[Record] = []
+    number = first_number
+    end_offset = start_offset
+    for raw, end_offset in _iter_records(path, start_offset):
+        number += 1
+        chunk.append((number, raw))
+        if len(chunk) >= chunk_size:
+            yield chunk, end_offset
+            chunk = []
+    if chunk:
+        yield chunk, end_offset
+
+
+def _clean(raw: Dict[str, Any]) -> Dict[str, Any]:
+    # Empty CSV cells mean "not recorded", so let the schema defaults apply
+    row = {k: v for k, v in raw.items() if v != "" and v is not None}
+    if isinstance(row.get("fmri_data"), str):
+        row["fmri_data"] = json.loads(row["fmri_data"])
+    return row
+
+
+def validate_chunk(kind: str, records: List[Record]) -> Tuple[List[Dict[str, Any]], List[Rejection]]:
+    """Validate records against the create schema; runs in a worker process"""
+    schema = IMPORT_KINDS[kind][1]
+    valid: List[Dict[str, Any]] = []
+    rejected: List[Rejection] = []
+    for number, raw in records:
+        try:
+            valid.append(schema.model_validate(_clean(raw)).model_dump())
+        except ValueError as e:
+            rejected.append((number, str(e)))
+    return valid, rejected
+
+
+class PatientLookup:
+    """Cache of patient email -> id and of known ids, filled with one query per batch of misses"""
+
+    def __init__(self, db: AsyncSession, batch_size: int = 500):
+        self.db = db
+        self.batch_size = batch_size
+        self._ids: Dict[str, Optional[int]] = {}
+        self._known: Dict[int, bool] = {}
+
+    async def load(self, emails: Iterable[str]) -> None:
+        misses = list({email for email in emails if email not in self._ids})
+        for start in range(0, len(misses), self.batch_size):
+            batch = misses[start:start + self.batch_size]
+            result = await self.db.execute(
+                select(Patient.email, Patient.id).filter(Patient.email.in_(batch))
+            )
+            found = dict(result.all())
+            for email in batch:
+                self._ids[email] = found.get(email)
+
+    def get(self, email: str) -> Optional[int]:
+        return self._ids.get(email)
+
+    async def load_ids(self, patient_ids: Iterable[int]) -> None:
+        misses = list({patient_id for patient_id in patient_ids if patient_id not in self._known})
+        for start in range(0, len(misses), self.batch_size):
+            batch = misses[start:start + self.batch_size]
+            result = await self.db.execute(select(Patient.id).filter(Patient.id.in_(batch)))
+            found = set(result.scalars().all())
+            for patient_id in batch:
+                self._known[patient_id] = patient_id in found
+
+    def exists(self, patient_id: int) -> bool:
+        return self._known.get(patient_id, False)
+
+
+def _as_id(value: Any) -> Optional[int]:
+    """Integer patient id, or None to leave a malformed value to schema validation"""
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return None
+
+
+async def _resolve_patients(
+    lookup: PatientLookup, records: List[Record]
+) -> Tuple[List[Record], List[Rejection]]:
+    emails = [
+        str(raw["patient_email"]).strip()
+        for _, raw in records
+        if raw is not None and not raw.get("patient_id") and raw.get("patient_email")
+    ]
+    await lookup.load(emails)
+    supplied = [_as_id(raw["patient_id"]) for _, raw in records if raw is not None and raw.get("patient_id")]
+    await lookup.load_ids(patient_id for patient_id in supplied if patient_id is not None)
+
+    resolved: List[Record] = []
+    rejected: List[Rejection] = []
+    for number, raw in records:
+        if raw is None:
+            rejected.append((number, "Malformed JSON record"))
+            continue
+        raw = dict(raw)
+        email = raw.pop("patient_email", None)
+        if raw.get("patient_id"):
+            patient_id = _as_id(raw["patient_id"])
+            if patient_id is not None and not lookup.exists(patient_id):
+                rejected.append((number, f"Unknown patient id: {raw['patient_id']}"))
+                continue
+        elif email:
+            raw["patient_id"] = lookup.get(str(email).strip())
+            if raw["patient_id"] is None:
+                rejected.append((number, f"Unknown patient email: {email}"))
+                continue
+        resolved.append((number, raw))
+    return resolved, rejected
+
+
+async def _write_chunk(
+    db: AsyncSession,
+    kind: str,
+    checkpoint: ImportCheckpoint,
+    valid: List[Dict[str, Any]],
+    rejected: List[Rejection],
+    end_offset: int,
+    records_read: int,
+    rejects_path: Path,
+) -> None:
+    model = IMPORT_KINDS[kind][0]
+    rows = [model(**data) for data in valid]
+    db.add_all(rows)
+    if kind == "assessments":
+        await db.flush()
+        for assessment in rows:
+            db.add_all(build_series_points(assessment))
+            feature = build_fmri_feature(assessment)
+            if feature is not None:
+                db.add(feature)
+
+    # Rejects are durable before the checkpoint moves past them; lines of a
+    # chunk whose commit fails are trimmed when the import resumes
+    if rejected:
+        with open(rejects_path, "a") as f:
+            for number, error in sorted(rejected):
+                f.write(json.dumps({"record": number, "error": error}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    checkpoint.byte_offset = end_offset
+    checkpoint.records_read = records_read
+    checkpoint.rows_imported += len(rows)
+    checkpoint.rows_rejected += len(rejected)
+    await db.commit()
+
+
+def _trim_rejects(rejects_path: Path, records_read: int) -> None:
+    """Drop rejects of records past the checkpoint, left by a chunk that never committed"""
+    if not rejects_path.exists():
+        return
+    with open(rejects_path) as f:
+        lines = [line for line in f if json.loads(line)["record"] <= records_read]
+    with open(rejects_path, "w") as f:
+        f.writelines(lines)
+
+
+async def import_file(
+    db: AsyncSession,
+    kind: str,
+    path: Path,
+    workers: int = 1,
+    chunk_size: int = 5000,
+    restart: bool = False,
+) -> ImportCheckpoint:
+    """Import a CSV/NDJSON file, resuming from its checkpoint if there is one"""
+    path = Path(path).resolve()
+    source = f"{kind}:{path}"
+    rejects_path = path.with_name(path.name + ".rejects.ndjson")
+
+    result = await db.execute(select(ImportCheckpoint).filter(ImportCheckpoint.source == source))
+    checkpoint = result.scalars().first()
+    if checkpoint is None:
+        checkpoint = ImportCheckpoint(source=source)
+        db.add(checkpoint)
+    if checkpoint.id is None or restart:
+        checkpoint.byte_offset = 0
+        checkpoint.records_read = 0
+        checkpoint.rows_imported = 0
+        checkpoint.rows_rejected = 0
+        rejects_path.unlink(missing_ok=True)
+    await db.commit()
+    _trim_rejects(rejects_path, checkpoint.records_read)
+
+    lookup = PatientLookup(db)
+    loop = asyncio.get_running_loop()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    # Up to `workers` chunks are validated ahead of the one being written
+    pending = deque()
+    try:
+        chunks = _iter_chunks(path, checkpoint.byte_offset, checkpoint.records_read, chunk_size)
+        for records, end_offset in chunks:
+            resolved, unresolved = await _resolve_patients(lookup, records)
+            if executor is None:
+                validation = loop.create_future()
+                validation.set_result(validate_chunk(kind, resolved))
+            else:
+                validation = loop.run_in_executor(executor, validate_chunk, kind, resolved)
+            pending.append((validation, unresolved, end_offset, records[-1][0]))
+
+            while len(pending) > max(workers, 1) - 1:
+                validation, unresolved, end_offset, records_read = pending.popleft()
+                valid, invalid = await validation
+                await _write_chunk(
+                    db, kind, checkpoint, valid, unresolved + invalid, end_offset, records_read, rejects_path
+                )
+        while pending:
+            validation, unresolved, end_offset, records_read = pending.popleft()
+            valid, invalid = await validation
+            await _write_chunk(
+                db, kind, checkpoint, valid, unresolved + invalid, end_offset, records_read, rejects_path
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    return checkpoint
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from app.database import SessionLocal
+
+    async with SessionLocal() as db:
+        checkpoint = await import_file(
+            db,
+            args.kind,
+            Path(args.path),
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            restart=args.restart,
+        )
+    print(
+        f"{checkpoint.source}: {checkpoint.rows_imported} imported, "
+        f"{checkpoint.rows_rejected} rejected, {checkpoint.records_read} records read"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import assessments or treatments from CSV/NDJSON")
+    parser.add_argument("kind", choices=list(IMPORT_KINDS))
+    parser.add_argument("path", help="CSV file, or NDJSON file (one JSON object per line)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and import from the start")
+    asyncio.run(_main(parser.parse_args()))
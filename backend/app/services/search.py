@@ -0,0 +1,93 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.search import SEARCH_KINDS, patient_search_text
+
+KIND_NAMES = {code: name for name, code in SEARCH_KINDS.items()}
+
+_SQLITE_SEARCH = """
+SELECT rowid, patient_id,
+       snippet(search_index, 0, '<mark>', '</mark>', '...', 16) AS snippet,
+       bm25(search_index) AS rank
+FROM search_index
+WHERE search_index MATCH :match {kind_filter}
+ORDER BY rank
+LIMIT :limit OFFSET :skip
+"""
+
+# Expressions must match the GIN indexes in app.models.search exactly
+_POSTGRES_SEARCH = f"""
+WITH hits AS (
+    SELECT 'patient' AS kind, id, id AS patient_id, {patient_search_text()} AS body,
+           ts_rank(to_tsvector('simple', {patient_search_text()}), to_tsquery('simple', :tsquery)) AS rank
+    FROM patients
+    WHERE to_tsvector('simple', {patient_search_text()}) @@ to_tsquery('simple', :tsquery)
+    UNION ALL
+    SELECT 'assessment', id, patient_id, notes,
+           ts_rank(to_tsvector('english', coalesce(notes, '')), to_tsquery('english', :tsquery))
+    FROM assessments
+    WHERE to_tsvector('english', coalesce(notes, '')) @@ to_tsquery('english', :tsquery)
+    UNION ALL
+    SELECT 'treatment', id, patient_id, notes,
+           ts_rank(to_tsvector('english', coalesce(notes, '')), to_tsquery('english', :tsquery))
+    FROM treatments
+    WHERE to_tsvector('english', coalesce(notes, '')) @@ to_tsquery('english', :tsquery)
+)
+SELECT kind, id, patient_id,
+       ts_headline('simple', body, to_tsquery('simple', :tsquery),
+                   'StartSel=<mark>, StopSel=</mark>, MaxWords=16, MinWords=8') AS snippet,
+       -rank AS rank
+FROM (
+    SELECT * FROM hits {{kind_filter}} ORDER BY rank DESC LIMIT :limit OFFSET :skip
+) AS page
+ORDER BY rank
+"""
+
+
+def search_terms(q: str) -> List[str]:
+    """Word tokens of a free-text query; punctuation and FTS operators are dropped"""
+    return re.findall(r"\w+", q.lower())
+
+
+async def search(
+    db: AsyncSession, q: str, kind: Optional[str] = None, skip: int = 0, limit: int = 20
+) -> List[Dict[str, Any]]:
+    """Ranked prefix search over patient names/emails and assessment/treatment notes.
+
+    Every term must match; the last character of each term may be followed by
+    more characters, so partial names such as "jo smi" match "John Smith".
+    Lower ``rank`` is a better match.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return []
+
+    params: Dict[str, Any] = {"skip": skip, "limit": limit}
+    if db.bind.dialect.name == "postgresql":
+        params["tsquery"] = " & ".join(f"{term}:*" for term in terms)
+        kind_filter = ""
+        if kind is not None:
+            kind_filter = "WHERE kind = :kind"
+            params["kind"] = kind
+        result = await db.execute(text(_POSTGRES_SEARCH.format(kind_filter=kind_filter)), params)
+        return [dict(row._mapping) for row in result]
+
+    params["match"] = " ".join(f'"{term}"*' for term in terms)
+    kind_filter = ""
+    if kind is not None:
+        kind_filter = "AND rowid % 4 = :kind"
+        params["kind"] = SEARCH_KINDS[kind]
+    result = await db.execute(text(_SQLITE_SEARCH.format(kind_filter=kind_filter)), params)
+    return [
+        {
+            "kind": KIND_NAMES[row.rowid % 4],
+            "id": row.rowid // 4,
+            "patient_id": row.patient_id,
+            "snippet": row.snippet,
+            "rank": row.rank,
+        }
+        for row in result
+    ]
@@ -0,0 +1,307 @@
+"""Columnar snapshot export of the clinical tables for the research team.
+
+Rows are streamed from the database in ``chunk_size`` batches and written
+as compressed record batches, so memory use is bounded by one chunk no
+matter how large the table is. Each table gets its own directory of part
+files::
+
+    snapshots/
+        patients/part-00000.parquet
+        assessments/part-00000.parquet
+        assessments/part-00001.parquet   <- incremental append
+
+Assessments and treatments are read from the hot table together with its
+archive, so archived history stays in the snapshot.
+
+An incremental run (the default) only exports rows whose id is above the
+highest id already present in the previous parts. That watermark is read
+from Parquet footer statistics or from a memory-mapped Arrow IPC file, so
+old snapshot data is never loaded into memory. Appending to parts of another
+format, or of another ``fmri`` mode (recorded in the assessments schema
+metadata), is rejected. Updated rows are only
+picked up by a ``full`` snapshot. It is written to a staging directory and
+replaces the existing parts only once every table has been exported, so a
+failed run leaves the previous snapshot intact.
+
+pyarrow is an optional dependency (``poetry install -E research``)::
+
+    python -m app.services.snapshot --out snapshots --format parquet
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, JSON, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.assessment import Assessment
+from app.models.fmri_feature import FmriFeature
+from app.models.patient import Patient
+from app.models.treatment import Treatment
+from app.services.archive import ARCHIVE_TABLES
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional "research" extra
+    pa = pc = pq = None
+
+SNAPSHOT_TABLES = {
+    "patients": Patient,
+    "assessments": Assessment,
+    "treatments": Treatment,
+}
+SNAPSHOT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+FMRI_MODES = ("json", "flatten")
+
+# fmri_features columns appended to assessments when fmri_data is flattened
+FMRI_FEATURE_COLUMNS = (
+    "ecn_mean_activation",
+    "ecn_peak_activation",
+    "n_back_load_effect",
+    "ecn_mean_connectivity",
+    "ecn_region_count",
+)
+
+
+class SnapshotUnavailable(RuntimeError):
+    """Raised when the optional pyarrow dependency is not installed"""
+
+
+class SnapshotMismatch(ValueError):
+    """Raised when an incremental run does not match the format or fMRI mode of the existing parts"""
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise SnapshotUnavailable(
+            "Snapshot export requires pyarrow; install with `poetry install -E research`"
+        )
+
+
+def _arrow_type(column) -> "pa.DataType":
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Date):
+        return pa.date32()
+    # String, Text and JSON (serialised) columns
+    return pa.large_string() if isinstance(column.type, JSON) else pa.string()
+
+
+def _export_columns(table: str, fmri: str) -> List[Any]:
+    model = SNAPSHOT_TABLES[table]
+    columns = list(model.__table__.columns)
+    if table == "assessments" and fmri == "flatten":
+        columns = [c for c in columns if c.name != "fmri_data"]
+        columns += [FmriFeature.__table__.c[name] for name in FMRI_FEATURE_COLUMNS]
+    return columns
+
+
+def _export_source(table: str, since_id: int):
+    """Rows above ``since_id`` from the hot table and, if it has one, its archive"""
+    hot = SNAPSHOT_TABLES[table].__table__
+    rows = select(hot).where(hot.c.id > since_id)
+    if table in ARCHIVE_TABLES:
+        archive = ARCHIVE_TABLES[table]
+        cold = select(*(archive.c[c.name] for c in hot.columns)).where(archive.c.id > since_id)
+        rows = union_all(rows, cold)
+    return rows.subquery()
+
+
+def _part_files(table_dir: Path) -> List[Path]:
+    return sorted(path for path in table_dir.glob("part-*") if path.suffix in SNAPSHOT_FORMATS.values())
+
+
+def _part_schema(path: Path) -> "pa.Schema":
+    if path.suffix == ".parquet":
+        return pq.read_schema(path)
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.open_file(source).schema
+
+
+def _check_previous(table: str, previous: List[Path], fmt: str, fmri: str) -> None:
+    """Reject appending parts that would mix formats or fMRI modes in one directory"""
+    suffixes = {path.suffix for path in previous}
+    if suffixes != {SNAPSHOT_FORMATS[fmt]}:
+        formats = "/".join(name for name, suffix in SNAPSHOT_FORMATS.items() if suffix in suffixes)
+        raise SnapshotMismatch(
+            f"{table} already has {formats} parts; append in that format or run a full snapshot"
+        )
+    if table == "assessments":
+        metadata = _part_schema(previous[-1]).metadata or {}
+        written = metadata.get(b"fmri", b"").decode()
+        if written != fmri:
+            raise SnapshotMismatch(
+                f"assessments parts were written with fmri={written or 'unknown'}; "
+                f"append with that mode or run a full snapshot"
+            )
+
+
+def _max_id(path: Path) -> Optional[int]:
+    """Highest id in a previous part file, without reading its data pages"""
+    if path.suffix == ".parquet":
+        metadata = pq.ParquetFile(path).metadata
+        index = metadata.schema.to_arrow_schema().get_field_index("id")
+        maxima = [
+            metadata.row_group(i).column(index).statistics.max
+            for i in range(metadata.num_row_groups)
+            if metadata.row_group(i).column(index).statistics is not None
+        ]
+        return max(maxima) if maxima else None
+    # Parts are written in id order, so the last batch holds the highest id.
+    # Only its id buffers are read and decompressed.
+    with pa.memory_map(str(path), "r") as source:
+        index = pa.ipc.open_file(source).schema.get_field_index("id")
+        reader = pa.ipc.open_file(source, options=pa.ipc.IpcReadOptions(included_fields=[index]))
+        if reader.num_record_batches == 0:
+            return None
+        ids = reader.get_batch(reader.num_record_batches - 1).column(0)
+        return pc.max(ids).as_py()
+
+
+def _open_writer(path: Path, fmt: str, schema: "pa.Schema", compression: str):
+    if fmt == "parquet":
+        return pq.ParquetWriter(str(path), schema, compression=compression)
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    return pa.ipc.new_file(str(path), schema, options=options)
+
+
+async def export_table(
+    db: AsyncSession,
+    table: str,
+    out_dir: Path,
+    fmt: str = "parquet",
+    fmri: str = "json",
+    full: bool = False,
+    chunk_size: int = 50_000,
+    compression: str = "zstd",
+) -> Dict[str, Any]:
+    """Stream one table into a new part file and return its manifest entry"""
+    _require_pyarrow()
+    if full:
+        entries = await _export_full(
+            db, out_dir, [table], fmt=fmt, fmri=fmri, chunk_size=chunk_size, compression=compression
+        )
+        return entries[0]
+    suffix = SNAPSHOT_FORMATS[fmt]
+    table_dir = out_dir / table
+    table_dir.mkdir(parents=True, exist_ok=True)
+
+    previous = _part_files(table_dir)
+    if previous:
+        _check_previous(table, previous, fmt, fmri)
+    watermarks = [m for m in (_max_id(path) for path in previous) if m is not None]
+    since_id = max(watermarks) if watermarks else 0
+
+    model = SNAPSHOT_TABLES[table]
+    columns = _export_columns(table, fmri)
+    metadata = {"fmri": fmri} if table == "assessments" else None
+    schema = pa.schema([pa.field(c.name, _arrow_type(c)) for c in columns], metadata=metadata)
+    json_columns = {c.name for c in columns if isinstance(c.type, JSON)}
+
+    source = _export_source(table, since_id)
+    query = select(*(source.c[c.name] if c.table is model.__table__ else c for c in columns))
+    if table == "assessments" and fmri == "flatten":
+        query = query.outerjoin(FmriFeature, FmriFeature.assessment_id == source.c.id)
+    query = query.order_by(source.c.id)
+
+    path = table_dir / f"part-{len(previous):05d}{suffix}"
+    rows = 0
+    writer = None
+    result = await db.stream(query.execution_options(yield_per=chunk_size))
+    try:
+        async for partition in result.partitions():
+            values = list(zip(*partition))
+            arrays = []
+            for column, column_values in zip(columns, values):
+                if column.name in json_columns:
+                    column_values = [None if v is None else json.dumps(v) for v in column_values]
+                arrays.append(pa.array(column_values, type=_arrow_type(column)))
+            batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
+            if writer is None:
+                writer = _open_writer(path, fmt, schema, compression)
+            await asyncio.to_thread(writer.write_batch, batch)
+            rows += batch.num_rows
+    finally:
+        await result.close()
+        if writer is not None:
+            writer.close()
+
+    return {
+        "table": table,
+        "file": str(path.relative_to(out_dir)) if rows else None,
+        "rows": rows,
+        "since_id": since_id,
+    }
+
+
+async def _export_full(db: AsyncSession, out_dir: Path, tables: List[str], **options: Any) -> List[Dict[str, Any]]:
+    """Export ``tables`` from scratch into a staging directory, then swap them in"""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=".full-", dir=out_dir))
+    try:
+        manifest = [await export_table(db, table, staging, **options) for table in tables]
+        for table in tables:
+            target = out_dir / table
+            if target.exists():
+                target.rename(staging / f"{table}.replaced")
+            (staging / table).rename(target)
+    finally:
+        shutil.rmtree(staging)
+    return manifest
+
+
+async def export_snapshot(
+    db: AsyncSession,
+    out_dir: Path,
+    tables: Optional[List[str]] = None,
+    **options: Any,
+) -> List[Dict[str, Any]]:
+    """Export each requested table; see export_table for the options"""
+    if options.pop("full", False):
+        return await _export_full(db, Path(out_dir), tables or list(SNAPSHOT_TABLES), **options)
+    return [
+        await export_table(db, table, Path(out_dir), **options)
+        for table in (tables or list(SNAPSHOT_TABLES))
+    ]
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from app.database import SessionLocal
+
+    async with SessionLocal() as db:
+        manifest = await export_snapshot(
+            db,
+            Path(args.out),
+            tables=args.tables,
+            fmt=args.format,
+            fmri=args.fmri,
+            full=args.full,
+            chunk_size=args.chunk_size,
+        )
+    for entry in manifest:
+        print(f"{entry['table']}: {entry['rows']} rows -> {entry['file']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a columnar snapshot of the clinical tables")
+    parser.add_argument("--out", default=os.getenv("SNAPSHOT_DIR", "snapshots"))
+    parser.add_argument("--tables", nargs="+", choices=list(SNAPSHOT_TABLES))
+    parser.add_argument("--format", choices=list(SNAPSHOT_FORMATS), default="parquet")
+    parser.add_argument("--fmri", choices=FMRI_MODES, default="json")
+    parser.add_argument("--full", action="store_true", help="Replace previous parts instead of appending")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    asyncio.run(_main(parser.parse_args()))
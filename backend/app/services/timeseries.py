@@ -0,0 +1,114 @@
+from datetime import date
+from typing import List, Sequence, Tuple
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.assessment import Assessment
+from app.models.biomarker_series import BiomarkerPoint
+
+# Assessment columns mirrored into the biomarker_series table
+SERIES_METRICS = (
+    "crp_level",
+    "il6_level",
+    "tnf_alpha_level",
+    "n_back_task_score",
+    "wpai_score",
+)
+
+Point = Tuple[date, float]
+
+
+def build_series_points(assessment: Assessment) -> List[BiomarkerPoint]:
+    """Series points for every tracked metric an assessment has a value for"""
+    return [
+        BiomarkerPoint(
+            patient_id=assessment.patient_id,
+            assessment_id=assessment.id,
+            metric=metric,
+            recorded_on=assessment.assessment_date,
+            value=getattr(assessment, metric),
+        )
+        for metric in SERIES_METRICS
+        if getattr(assessment, metric) is not None
+    ]
+
+
+async def sync_assessment_series(db: AsyncSession, assessment: Assessment) -> None:
+    """Replace the series points derived from an assessment.
+
+    Must be called inside the same transaction as the assessment write so
+    the series never drifts from its source row.
+    """
+    await clear_assessment_series(db, assessment.id)
+    db.add_all(build_series_points(assessment))
+
+
+async def clear_assessment_series(db: AsyncSession, assessment_id: int) -> None:
+    """Remove all series points derived from an assessment."""
+    await db.execute(delete(BiomarkerPoint).where(BiomarkerPoint.assessment_id == assessment_id))
+
+
+def lttb(points: Sequence[Point], threshold: int) -> List[Point]:
+    """Downsample with Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last points and, for every bucket in between, the
+    point forming the largest triangle with its neighbours. Points must be
+    ordered by date.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    xs = [p[0].toordinal() for p in points]
+    ys = [p[1] for p in points]
+    sampled = [points[0]]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third vertex of the triangle
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = xs[a], ys[a]
+        best_area = -1.0
+        best = start
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        sampled.append(points[best])
+        a = best
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def minmax(points: Sequence[Point], threshold: int) -> List[Point]:
+    """Downsample by keeping the min and max point of each bucket.
+
+    Emits at most ``threshold`` points in date order. Points must be
+    ordered by date.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 2:
+        return list(points)
+
+    buckets = threshold // 2
+    bucket_size = n / buckets
+    sampled: List[Point] = []
+    for i in range(buckets):
+        start = int(i * bucket_size)
+        end = int((i + 1) * bucket_size)
+        lo = min(range(start, end), key=lambda j: points[j][1])
+        hi = max(range(start, end), key=lambda j: points[j][1])
+        for j in sorted({lo, hi}):
+            sampled.append(points[j])
+    return sampled
@@ -0,0 +1,162 @@
+"""Bytes saved versus latency added by response compression.
+
+Builds a synthetic ``read_assessments`` payload with fMRI data and notes,
+then reports:
+
+1. per encoding and level: compressed size, compression and decompression
+   time for the whole payload;
+2. end to end through ``CompressionMiddleware``, for a buffered JSON
+   response and a chunked NDJSON stream: server time to last byte, bytes on
+   the wire, and the total including transfer at ``--mbps``.
+
+zstd and brotli rows only appear when the ``compression`` extra is installed::
+
+    python -m benchmarks.compression --rows 500 --mbps 50
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from httpx import AsyncClient
+
+from app.compression import ENCODERS, CompressedCache, CompressionMiddleware
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 11), "zstd": (1, 3, 19)}
+
+
+def build_assessments(rows: int, seed: int = 0) -> List[dict]:
+    rng = np.random.default_rng(seed)
+    regions, timepoints = 12, 120
+    assessments = []
+    for i in range(rows):
+        timeseries = rng.normal(0, 1, (regions, timepoints)).round(4)
+        assessments.append({
+            "id": i + 1,
+            "patient_id": i // 8 + 1,
+            "assessment_date": (date(2024, 1, 1) + timedelta(days=i)).isoformat(),
+            "assessment_type": "fMRI",
+            "fmri_data": {
+                "ecn_activation": rng.uniform(-0.5, 1.5, regions).round(4).tolist(),
+                "ecn_timeseries": timeseries.tolist(),
+                "connectivity_matrix": np.corrcoef(timeseries).round(4).tolist(),
+                "n_back_activation": {"0": 0.21, "1": 0.34, "2": round(float(rng.uniform(0, 1)), 4)},
+            },
+            "n_back_task_score": round(float(rng.uniform(40, 95)), 1),
+            "wpai_score": round(float(rng.uniform(0, 80)), 1),
+            "crp_level": round(float(rng.uniform(0.1, 8)), 2),
+            "il6_level": None,
+            "tnf_alpha_level": None,
+            "notes": "Patient reports improved concentration at work; "
+                     "reduced DLPFC activation during 2-back persists.",
+            "created_at": "2024-06-01T09:30:00",
+            "updated_at": "2024-06-01T09:30:00",
+        })
+    return assessments
+
+
+def _codecs() -> Dict[str, Tuple[Callable[[bytes, int], bytes], Callable[[bytes], bytes]]]:
+    codecs = {"gzip": (lambda data, level: gzip.compress(data, compresslevel=level), gzip.decompress)}
+    if brotli is not None:
+        codecs["br"] = (lambda data, level: brotli.compress(data, quality=level), brotli.decompress)
+    if zstandard is not None:
+        codecs["zstd"] = (
+            lambda data, level: zstandard.ZstdCompressor(level=level).compress(data),
+            lambda data: zstandard.ZstdDecompressor().decompress(data),
+        )
+    return codecs
+
+
+def _median_ms(function: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def bench_encoders(payload: bytes, repeat: int) -> None:
+    print(f"Payload: {len(payload):,} bytes of JSON")
+    print(f"{'encoding':<8} {'level':>5} {'bytes':>12} {'saved':>7} {'compress ms':>12} {'decompress ms':>14}")
+    for name, (compress, decompress) in _codecs().items():
+        for level in LEVELS[name]:
+            compressed = compress(payload, level)
+            assert decompress(compressed) == payload
+            print(
+                f"{name:<8} {level:>5} {len(compressed):>12,} {1 - len(compressed) / len(payload):>7.1%} "
+                f"{_median_ms(lambda: compress(payload, level), repeat):>12.2f} "
+                f"{_median_ms(lambda: decompress(compressed), repeat):>14.2f}"
+            )
+
+
+def build_app(assessments: List[dict], chunk_rows: int) -> FastAPI:
+    app = FastAPI()
+    body = json.dumps(assessments).encode()
+
+    @app.get("/json")
+    async def buffered():
+        return Response(body, media_type="application/json")
+
+    @app.get("/ndjson")
+    async def streamed():
+        async def chunks():
+            for start in range(0, len(assessments), chunk_rows):
+                yield "".join(json.dumps(row) + "\n" for row in assessments[start:start + chunk_rows]).encode()
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    return app
+
+
+async def bench_middleware(assessments: List[dict], repeat: int, mbps: float, chunk_rows: int) -> None:
+    # No cache: every request pays the full compression cost
+    app = CompressionMiddleware(
+        build_app(assessments, chunk_rows), cache=CompressedCache(max_bytes=0, max_entry_bytes=0)
+    )
+    print(f"\nThrough CompressionMiddleware (transfer estimated at {mbps:g} Mbit/s)")
+    print(f"{'path':<8} {'encoding':<9} {'wire bytes':>12} {'server ms':>10} {'transfer ms':>12} {'total ms':>9}")
+    async with AsyncClient(app=app, base_url="http://bench") as client:
+        for path in ("/json", "/ndjson"):
+            for encoding in ["identity", *ENCODERS]:
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    async with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+                        wire_bytes = sum([len(chunk) async for chunk in response.aiter_raw()])
+                    timings.append(time.perf_counter() - started)
+                server_ms = statistics.median(timings) * 1000
+                transfer_ms = wire_bytes * 8 / (mbps * 1e6) * 1000
+                print(
+                    f"{path:<8} {encoding:<9} {wire_bytes:>12,} {server_ms:>10.2f} "
+                    f"{transfer_ms:>12.2f} {server_ms + transfer_ms:>9.2f}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark response compression on assessment payloads")
+    parser.add_argument("--rows", type=int, default=200, help="Assessments in the payload")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per measurement (median is reported)")
+    parser.add_argument("--mbps", type=float, default=50.0, help="Link speed for the transfer time estimate")
+    parser.add_argument("--chunk-rows", type=int, default=25, help="Rows per chunk of the NDJSON stream")
+    args = parser.parse_args()
+
+    data = build_assessments(args.rows)
+    bench_encoders(json.dumps(data).encode(), args.repeat)
+    asyncio.run(bench_middleware(data, args.repeat, args.mbps, args.chunk_rows))
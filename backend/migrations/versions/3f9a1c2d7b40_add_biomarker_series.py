@@ -0,0 +1,49 @@
+"""Add biomarker_series time-series table
+
+Revision ID: 3f9a1c2d7b40
+Revises: 6518274cc107
+Create Date: 2026-10-19 09:12:41.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c2d7b40'
+down_revision = '6518274cc107'
+branch_labels = None
+depends_on = None
+
+SERIES_METRICS = ('crp_level', 'il6_level', 'tnf_alpha_level', 'n_back_task_score', 'wpai_score')
+
+
+def upgrade() -> None:
+    op.create_table('biomarker_series',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('assessment_id', sa.Integer(), nullable=False),
+    sa.Column('metric', sa.String(), nullable=False),
+    sa.Column('recorded_on', sa.Date(), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['assessment_id'], ['assessments.id'], ),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('assessment_id', 'metric', name='uq_biomarker_series_assessment_metric')
+    )
+    op.create_index(op.f('ix_biomarker_series_assessment_id'), 'biomarker_series', ['assessment_id'], unique=False)
+    op.create_index('ix_biomarker_series_lookup', 'biomarker_series', ['patient_id', 'metric', 'recorded_on'], unique=False)
+
+    # Populate the series from existing assessments
+    for metric in SERIES_METRICS:
+        op.execute(
+            f"INSERT INTO biomarker_series (patient_id, assessment_id, metric, recorded_on, value) "
+            f"SELECT patient_id, id, '{metric}', assessment_date, {metric} "
+            f"FROM assessments WHERE {metric} IS NOT NULL"
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_biomarker_series_lookup', table_name='biomarker_series')
+    op.drop_index(op.f('ix_biomarker_series_assessment_id'), table_name='biomarker_series')
+    op.drop_table('biomarker_series')
@@ -0,0 +1,48 @@
+"""Add fmri_features table
+
+Revision ID: 8c2e5b71d9a3
+Revises: 3f9a1c2d7b40
+Create Date: 2026-10-19 11:40:07.562931
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c2e5b71d9a3'
+down_revision = '3f9a1c2d7b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing assessments are populated by the fmri_features backfill (f5a0c93d2e61)
+    op.create_table('fmri_features',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('assessment_id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('ecn_mean_activation', sa.Float(), nullable=True),
+    sa.Column('ecn_peak_activation', sa.Float(), nullable=True),
+    sa.Column('n_back_load_effect', sa.Float(), nullable=True),
+    sa.Column('ecn_mean_connectivity', sa.Float(), nullable=True),
+    sa.Column('ecn_region_count', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['assessment_id'], ['assessments.id'], ),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('assessment_id')
+    )
+    op.create_index(op.f('ix_fmri_features_id'), 'fmri_features', ['id'], unique=False)
+    op.create_index(op.f('ix_fmri_features_patient_id'), 'fmri_features', ['patient_id'], unique=False)
+    op.create_index(op.f('ix_fmri_features_ecn_mean_activation'), 'fmri_features', ['ecn_mean_activation'], unique=False)
+    op.create_index(op.f('ix_fmri_features_ecn_mean_connectivity'), 'fmri_features', ['ecn_mean_connectivity'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_fmri_features_ecn_mean_connectivity'), table_name='fmri_features')
+    op.drop_index(op.f('ix_fmri_features_ecn_mean_activation'), table_name='fmri_features')
+    op.drop_index(op.f('ix_fmri_features_patient_id'), table_name='fmri_features')
+    op.drop_index(op.f('ix_fmri_features_id'), table_name='fmri_features')
+    op.drop_table('fmri_features')
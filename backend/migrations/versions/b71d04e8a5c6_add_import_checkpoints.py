@@ -0,0 +1,37 @@
+"""Add import_checkpoints table
+
+Revision ID: b71d04e8a5c6
+Revises: 8c2e5b71d9a3
+Create Date: 2026-10-19 14:05:52.904417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71d04e8a5c6'
+down_revision = '8c2e5b71d9a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('import_checkpoints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('byte_offset', sa.BigInteger(), nullable=False),
+    sa.Column('records_read', sa.Integer(), nullable=False),
+    sa.Column('rows_imported', sa.Integer(), nullable=False),
+    sa.Column('rows_rejected', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('source')
+    )
+    op.create_index(op.f('ix_import_checkpoints_id'), 'import_checkpoints', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_import_checkpoints_id'), table_name='import_checkpoints')
+    op.drop_table('import_checkpoints')
@@ -0,0 +1,76 @@
+"""Add full-text search index
+
+Revision ID: d94a6f3e2b18
+Revises: b71d04e8a5c6
+Create Date: 2026-10-19 16:21:36.470195
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd94a6f3e2b18'
+down_revision = 'b71d04e8a5c6'
+branch_labels = None
+depends_on = None
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(body, patient_id UNINDEXED, tokenize='unicode61', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS patients_search_ai AFTER INSERT ON patients BEGIN INSERT INTO search_index(rowid, body, patient_id) VALUES (new.id * 4 + 1, new.first_name || ' ' || new.last_name || ' ' || new.email, new.id); END",
+    "CREATE TRIGGER IF NOT EXISTS patients_search_au AFTER UPDATE OF first_name, last_name, email ON patients BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 1; INSERT INTO search_index(rowid, body, patient_id) VALUES (new.id * 4 + 1, new.first_name || ' ' || new.last_name || ' ' || new.email, new.id); END",
+    'CREATE TRIGGER IF NOT EXISTS patients_search_ad AFTER DELETE ON patients BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 1; END',
+    'CREATE TRIGGER IF NOT EXISTS assessments_search_ai AFTER INSERT ON assessments WHEN new.notes IS NOT NULL BEGIN INSERT INTO search_index(rowid, body, patient_id) VALUES (new.id * 4 + 2, new.notes, new.patient_id); END',
+    'CREATE TRIGGER IF NOT EXISTS assessments_search_au AFTER UPDATE OF notes ON assessments BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 2; INSERT INTO search_index(rowid, body, patient_id) SELECT new.id * 4 + 2, new.notes, new.patient_id WHERE new.notes IS NOT NULL; END',
+    'CREATE TRIGGER IF NOT EXISTS assessments_search_ad AFTER DELETE ON assessments BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 2; END',
+    'CREATE TRIGGER IF NOT EXISTS treatments_search_ai AFTER INSERT ON treatments WHEN new.notes IS NOT NULL BEGIN INSERT INTO search_index(rowid, body, patient_id) VALUES (new.id * 4 + 3, new.notes, new.patient_id); END',
+    'CREATE TRIGGER IF NOT EXISTS treatments_search_au AFTER UPDATE OF notes ON treatments BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 3; INSERT INTO search_index(rowid, body, patient_id) SELECT new.id * 4 + 3, new.notes, new.patient_id WHERE new.notes IS NOT NULL; END',
+    'CREATE TRIGGER IF NOT EXISTS treatments_search_ad AFTER DELETE ON treatments BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 3; END',
+]
+
+POSTGRES_SEARCH_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_patients_search ON patients USING gin (to_tsvector('simple', first_name || ' ' || last_name || ' ' || email))",
+    "CREATE INDEX IF NOT EXISTS ix_assessments_notes_search ON assessments USING gin (to_tsvector('english', coalesce(notes, '')))",
+    "CREATE INDEX IF NOT EXISTS ix_treatments_notes_search ON treatments USING gin (to_tsvector('english', coalesce(notes, '')))",
+]
+
+SEARCH_TRIGGERS = [
+    f"{table}_search_{event}"
+    for table in ('patients', 'assessments', 'treatments')
+    for event in ('ai', 'au', 'ad')
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        # Index existing rows; rowid encodes (id, kind) as id * 4 + kind
+        op.execute(
+            "INSERT INTO search_index(rowid, body, patient_id) "
+            "SELECT id * 4 + 1, first_name || ' ' || last_name || ' ' || email, id FROM patients"
+        )
+        op.execute(
+            "INSERT INTO search_index(rowid, body, patient_id) "
+            "SELECT id * 4 + 2, notes, patient_id FROM assessments WHERE notes IS NOT NULL"
+        )
+        op.execute(
+            "INSERT INTO search_index(rowid, body, patient_id) "
+            "SELECT id * 4 + 3, notes, patient_id FROM treatments WHERE notes IS NOT NULL"
+        )
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_SEARCH_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in SEARCH_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS search_index")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_treatments_notes_search")
+        op.execute("DROP INDEX IF EXISTS ix_assessments_notes_search")
+        op.execute("DROP INDEX IF EXISTS ix_patients_search")
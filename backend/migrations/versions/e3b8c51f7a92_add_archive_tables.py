@@ -0,0 +1,111 @@
+"""Add archive tables for assessments and treatments
+
+Revision ID: e3b8c51f7a92
+Revises: d94a6f3e2b18
+Create Date: 2026-10-19 18:47:15.031862
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b8c51f7a92'
+down_revision = 'd94a6f3e2b18'
+branch_labels = None
+depends_on = None
+
+# Lets batch mode address the unnamed foreign keys created by earlier revisions
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+# Rebuilding a SQLite table drops its triggers; these are the search triggers from d94a6f3e2b18
+SQLITE_SEARCH_TRIGGERS = {
+    'assessments': [
+        'CREATE TRIGGER IF NOT EXISTS assessments_search_ai AFTER INSERT ON assessments WHEN new.notes IS NOT NULL BEGIN INSERT INTO search_index(rowid, body, patient_id) VALUES (new.id * 4 + 2, new.notes, new.patient_id); END',
+        'CREATE TRIGGER IF NOT EXISTS assessments_search_au AFTER UPDATE OF notes ON assessments BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 2; INSERT INTO search_index(rowid, body, patient_id) SELECT new.id * 4 + 2, new.notes, new.patient_id WHERE new.notes IS NOT NULL; END',
+        'CREATE TRIGGER IF NOT EXISTS assessments_search_ad AFTER DELETE ON assessments BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 2; END',
+    ],
+    'treatments': [
+        'CREATE TRIGGER IF NOT EXISTS treatments_search_ai AFTER INSERT ON treatments WHEN new.notes IS NOT NULL BEGIN INSERT INTO search_index(rowid, body, patient_id) VALUES (new.id * 4 + 3, new.notes, new.patient_id); END',
+        'CREATE TRIGGER IF NOT EXISTS treatments_search_au AFTER UPDATE OF notes ON treatments BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 3; INSERT INTO search_index(rowid, body, patient_id) SELECT new.id * 4 + 3, new.notes, new.patient_id WHERE new.notes IS NOT NULL; END',
+        'CREATE TRIGGER IF NOT EXISTS treatments_search_ad AFTER DELETE ON treatments BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 3; END',
+    ],
+}
+
+
+def rebuild_sqlite_tables(autoincrement: bool) -> None:
+    """Recreate the hot tables with or without AUTOINCREMENT, restoring their search triggers"""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table, triggers in SQLITE_SEARCH_TRIGGERS.items():
+        with op.batch_alter_table(table, recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement}):
+            pass
+        for statement in triggers:
+            op.execute(statement)
+
+
+def upgrade() -> None:
+    op.create_table('assessments_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('assessment_date', sa.Date(), nullable=False),
+    sa.Column('assessment_type', sa.String(), nullable=False),
+    sa.Column('fmri_data', sa.JSON(), nullable=True),
+    sa.Column('n_back_task_score', sa.Float(), nullable=True),
+    sa.Column('wpai_score', sa.Float(), nullable=True),
+    sa.Column('crp_level', sa.Float(), nullable=True),
+    sa.Column('il6_level', sa.Float(), nullable=True),
+    sa.Column('tnf_alpha_level', sa.Float(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_assessments_archive_patient_id', 'assessments_archive', ['patient_id'], unique=False)
+    op.create_table('treatments_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('medication_name', sa.String(), nullable=False),
+    sa.Column('dosage', sa.String(), nullable=False),
+    sa.Column('frequency', sa.String(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_responder', sa.Boolean(), nullable=True),
+    sa.Column('efficacy_rating', sa.Float(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_treatments_archive_patient_id', 'treatments_archive', ['patient_id'], unique=False)
+    op.create_table('archive_watermarks',
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('archived_before', sa.Date(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+
+    # Derived rows outlive their assessment once it is archived
+    with op.batch_alter_table('biomarker_series', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint('fk_biomarker_series_assessment_id_assessments', type_='foreignkey')
+    with op.batch_alter_table('fmri_features', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint('fk_fmri_features_assessment_id_assessments', type_='foreignkey')
+
+    # An archived row's id must not be given to a new hot row: its search
+    # entry, series points and features still refer to it
+    rebuild_sqlite_tables(autoincrement=True)
+
+
+def downgrade() -> None:
+    rebuild_sqlite_tables(autoincrement=False)
+    with op.batch_alter_table('fmri_features', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.create_foreign_key('fk_fmri_features_assessment_id_assessments', 'assessments', ['assessment_id'], ['id'])
+    with op.batch_alter_table('biomarker_series', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.create_foreign_key('fk_biomarker_series_assessment_id_assessments', 'assessments', ['assessment_id'], ['id'])
+    op.drop_table('archive_watermarks')
+    op.drop_index('ix_treatments_archive_patient_id', table_name='treatments_archive')
+    op.drop_table('treatments_archive')
+    op.drop_index('ix_assessments_archive_patient_id', table_name='assessments_archive')
+    op.drop_table('assessments_archive')
@@ -0,0 +1,45 @@
+"""Add backfill_checkpoints table and backfill fmri_features
+
+Revision ID: f5a0c93d2e61
+Revises: e3b8c51f7a92
+Create Date: 2026-10-19 16:48:27.530162
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.backfill import run_in_migration
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5a0c93d2e61'
+down_revision = 'e3b8c51f7a92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('backfill_checkpoints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('worker', sa.Integer(), nullable=False),
+    sa.Column('workers', sa.Integer(), nullable=False),
+    sa.Column('start_key', sa.BigInteger(), nullable=False),
+    sa.Column('end_key', sa.BigInteger(), nullable=True),
+    sa.Column('last_key', sa.BigInteger(), nullable=False),
+    sa.Column('rows_processed', sa.Integer(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name', 'worker', name='uq_backfill_checkpoints_name_worker')
+    )
+    op.create_index(op.f('ix_backfill_checkpoints_id'), 'backfill_checkpoints', ['id'], unique=False)
+
+    # Features of assessments created before extraction ran on every write
+    run_in_migration('fmri_features')
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_backfill_checkpoints_id'), table_name='backfill_checkpoints')
+    op.drop_table('backfill_checkpoints')
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from httpx import AsyncClient
+
+from app.admission import AdmissionControlMiddleware, AdmissionLimiter, Overloaded, classify
+from app.main import app
+from .test_main import test_client, override_get_db, test_db
+
+
+def test_classify_routes():
+    assert classify("GET", "/api/patients/12") == "interactive"
+    assert classify("GET", "/api/patients/") == "bulk"
+    assert classify("POST", "/api/assessments/") == "write"
+    assert classify("POST", "/api/exports/snapshot") == "bulk"
+    assert classify("GET", "/api/health") is None
+
+
+@pytest.mark.asyncio
+async def test_limiter_serves_higher_priority_first():
+    limiter = AdmissionLimiter("test", limit=1, max_queue=10, max_wait=5.0)
+    held = await limiter.acquire()
+    order = []
+    
+    async def request(name, priority):
+        acquired_at = await limiter.acquire(priority)
+        order.append(name)
+        limiter.release(acquired_at)
+    
+    bulk = asyncio.create_task(request("bulk", 2))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(request("interactive", 0))
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 2
+    
+    limiter.release(held)
+    await asyncio.gather(bulk, interactive)
+    assert order == ["interactive", "bulk"]
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_sheds_when_queue_is_full():
+    limiter = AdmissionLimiter("test", limit=1, max_queue=1, max_wait=0.05)
+    held = await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    
+    with pytest.raises(Overloaded):
+        await limiter.acquire()
+    with pytest.raises(Overloaded):
+        await waiter
+    
+    limiter.release(held)
+    assert limiter.stats()["rejected"] == 2
+    assert limiter.stats()["timed_out"] == 1
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_middleware_returns_503_with_retry_after(test_client):
+    limiter = AdmissionLimiter("bulk", limit=1, max_queue=0, max_wait=1.0)
+    await limiter.acquire()
+    shedding_app = AdmissionControlMiddleware(app, limiters={"bulk": limiter})
+    
+    async with AsyncClient(app=shedding_app, base_url="http://test") as client:
+        response = await client.get("/api/patients/")
+    
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+@pytest.mark.asyncio
+async def test_admission_metrics(test_client):
+    response = await test_client.get("/api/metrics/admission")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["routes"]) == {"interactive", "write", "bulk"}
+    assert "queue_depth" in data["db_sessions"]
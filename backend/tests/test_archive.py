@@ -0,0 +1,149 @@
+import pytest
+from datetime import date
+
+from sqlalchemy.future import select
+
+from app.models.archive import assessments_archive
+from app.models.assessment import Assessment
+from app.services.archive import archive_table
+from .test_main import test_client, override_get_db, test_db
+
+
+@pytest.mark.asyncio
+async def test_archived_rows_stay_readable(test_client, test_db):
+    create_response = await test_client.post(
+        "/api/patients/",
+        json={
+            "first_name": "Henrik",
+            "last_name": "Larsen",
+            "date_of_birth": "1958-03-27",
+            "email": "henrik.larsen@example.com",
+        },
+    )
+    patient_id = create_response.json()["id"]
+    ids = []
+    for assessment_date, notes in (("2015-06-01", "Baseline tinnitus noted"), ("2025-06-01", None)):
+        create_response = await test_client.post(
+            "/api/assessments/",
+            json={
+                "patient_id": patient_id,
+                "assessment_date": assessment_date,
+                "assessment_type": "WPAI",
+                "wpai_score": 30.0,
+                "notes": notes,
+            },
+        )
+        ids.append(create_response.json()["id"])
+    old_id, recent_id = ids
+    
+    moved = await archive_table(test_db, "assessments", date(2020, 1, 1), batch_size=1)
+    
+    assert moved == 1
+    result = await test_db.execute(select(Assessment.id))
+    assert result.scalars().all() == [recent_id]
+    result = await test_db.execute(select(assessments_archive.c.id))
+    assert result.scalars().all() == [old_id]
+    
+    # Per-patient history includes the archive unless the range starts after the watermark
+    response = await test_client.get(f"/api/assessments/patient/{patient_id}")
+    assert [a["id"] for a in response.json()] == [old_id, recent_id]
+    response = await test_client.get(
+        f"/api/assessments/patient/{patient_id}", params={"from_date": "2021-01-01"}
+    )
+    assert [a["id"] for a in response.json()] == [recent_id]
+    
+    response = await test_client.get("/api/assessments/", params={"fields": "id,assessment_date"})
+    assert response.json() == [
+        {"id": old_id, "assessment_date": "2015-06-01"},
+        {"id": recent_id, "assessment_date": "2025-06-01"},
+    ]
+    response = await test_client.get("/api/assessments/", params={"from_date": "2021-01-01"})
+    assert [a["id"] for a in response.json()] == [recent_id]
+    
+    response = await test_client.get(f"/api/assessments/{old_id}")
+    assert response.status_code == 200
+    assert response.json()["notes"] == "Baseline tinnitus noted"
+    response = await test_client.patch(f"/api/assessments/{old_id}", json={"notes": "Edited"})
+    assert response.status_code == 409
+    response = await test_client.delete(f"/api/assessments/{old_id}")
+    assert response.status_code == 409
+    response = await test_client.delete("/api/assessments/9999")
+    assert response.status_code == 404
+    
+    response = await test_client.get("/api/search/", params={"q": "tinnitus"})
+    assert [(hit["kind"], hit["id"]) for hit in response.json()] == [("assessment", old_id)]
+    
+    response = await test_client.get(
+        f"/api/patients/{patient_id}/series", params={"metric": "wpai_score"}
+    )
+    assert response.json()["total_points"] == 2
+
+
+@pytest.mark.asyncio
+async def test_archive_treatments_keeps_active_ones(test_client, test_db):
+    create_response = await test_client.post(
+        "/api/patients/",
+        json={
+            "first_name": "Sofia",
+            "last_name": "Marques",
+            "date_of_birth": "1990-12-12",
+            "email": "sofia.marques@example.com",
+        },
+    )
+    patient_id = create_response.json()["id"]
+    treatment = {
+        "patient_id": patient_id,
+        "start_date": "2015-01-01",
+        "medication_name": "Ibuprofen",
+        "dosage": "400mg TID",
+        "frequency": "3 times daily",
+    }
+    await test_client.post("/api/treatments/", json=dict(treatment, end_date="2015-06-01", is_active=False))
+    await test_client.post("/api/treatments/", json=treatment)
+    
+    moved = await archive_table(test_db, "treatments", date(2020, 1, 1))
+    
+    assert moved == 1
+    response = await test_client.get(f"/api/treatments/patient/{patient_id}")
+    assert [t["is_active"] for t in response.json()] == [False, True]
+    response = await test_client.get("/api/treatments/", params={"from_date": "2021-01-01"})
+    assert [t["is_active"] for t in response.json()] == [True]
+
+
+@pytest.mark.asyncio
+async def test_archived_ids_are_not_reused(test_client, test_db):
+    create_response = await test_client.post(
+        "/api/patients/",
+        json={
+            "first_name": "Tomas",
+            "last_name": "Novak",
+            "date_of_birth": "1966-02-08",
+            "email": "tomas.novak@example.com",
+        },
+    )
+    patient_id = create_response.json()["id"]
+    assessment = {"patient_id": patient_id, "assessment_type": "WPAI", "wpai_score": 40.0}
+    # Imported history: the oldest assessment has the highest id
+    await test_client.post("/api/assessments/", json=dict(assessment, assessment_date="2025-02-01"))
+    create_response = await test_client.post(
+        "/api/assessments/", json=dict(assessment, assessment_date="2014-02-01", notes="Insomnia reported")
+    )
+    archived_id = create_response.json()["id"]
+    
+    await archive_table(test_db, "assessments", date(2020, 1, 1))
+    
+    create_response = await test_client.post(
+        "/api/assessments/", json=dict(assessment, assessment_date="2025-03-01", notes="Insomnia resolved")
+    )
+    assert create_response.status_code == 200
+    assert create_response.json()["id"] > archived_id
+    
+    response = await test_client.get(f"/api/assessments/{archived_id}")
+    assert response.json()["notes"] == "Insomnia reported"
+    response = await test_client.get(f"/api/assessments/patient/{patient_id}")
+    ids = [a["id"] for a in response.json()]
+    assert len(ids) == len(set(ids)) == 3
+    response = await test_client.get(
+        f"/api/patients/{patient_id}/series", params={"metric": "wpai_score"}
+    )
+    assert response.json()["total_points"] == 3
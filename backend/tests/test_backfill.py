@@ -0,0 +1,99 @@
+import argparse
+import pytest
+from sqlalchemy import delete, func
+from sqlalchemy.future import select
+
+from app.models.assessment import Assessment
+from app.models.backfill_checkpoint import BackfillCheckpoint
+from app.models.fmri_feature import FmriFeature
+from app.services.backfill import Backfill, _duty_cycle_arg, plan_backfill, run_worker
+from app.services.fmri_features import _backfill_chunk, fmri_features_backfill
+from .test_main import test_client, override_get_db, test_db
+
+
+async def _create_assessments(test_client, count):
+    create_response = await test_client.post(
+        "/api/patients/",
+        json={
+            "first_name": "Lena",
+            "last_name": "Fischer",
+            "date_of_birth": "1982-04-19",
+            "email": "lena.fischer@example.com",
+        },
+    )
+    patient_id = create_response.json()["id"]
+    for day in range(1, count + 1):
+        await test_client.post(
+            "/api/assessments/",
+            json={
+                "patient_id": patient_id,
+                "assessment_date": f"2025-03-{day:02d}",
+                "assessment_type": "fMRI",
+                "fmri_data": {"ecn_activation": [0.1 * day, 0.3]},
+            },
+        )
+
+
+async def _feature_count(test_db):
+    result = await test_db.execute(select(func.count(FmriFeature.id)))
+    return result.scalar()
+
+
+@pytest.mark.asyncio
+async def test_parallel_workers_cover_all_rows(test_client, test_db):
+    await _create_assessments(test_client, 5)
+    # Rows written before features were extracted on every write
+    await test_db.execute(delete(FmriFeature))
+    await test_db.commit()
+    
+    async with test_db.bind.connect() as connection:
+        plan = await connection.run_sync(plan_backfill, fmri_features_backfill, 2)
+        assert [(c.start_key, c.end_key) for c in plan] == [(0, 2), (2, None)]
+        for checkpoint in plan:
+            await connection.run_sync(run_worker, fmri_features_backfill, checkpoint.worker, 2)
+        # Completed workers have nothing left to do
+        assert await connection.run_sync(run_worker, fmri_features_backfill, 1) == 0
+    
+    assert await _feature_count(test_db) == 5
+    result = await test_db.execute(select(BackfillCheckpoint).order_by(BackfillCheckpoint.worker))
+    checkpoints = result.scalars().all()
+    assert [c.rows_processed for c in checkpoints] == [2, 3]
+    assert all(c.completed_at is not None for c in checkpoints)
+
+
+@pytest.mark.asyncio
+async def test_interrupted_backfill_resumes_after_last_chunk(test_client, test_db):
+    await _create_assessments(test_client, 5)
+    await test_db.execute(delete(FmriFeature))
+    await test_db.commit()
+    
+    def fail_on_fourth(connection, ids):
+        if 4 in ids:
+            raise RuntimeError("worker killed")
+        _backfill_chunk(connection, ids)
+    
+    failing = Backfill("fmri_features", Assessment.__table__, fail_on_fourth, chunk_size=2)
+    async with test_db.bind.connect() as connection:
+        await connection.run_sync(plan_backfill, failing)
+        with pytest.raises(RuntimeError):
+            await connection.run_sync(run_worker, failing)
+        await connection.rollback()
+        
+        result = await connection.execute(select(BackfillCheckpoint.last_key))
+        assert result.scalar() == 2
+        assert await connection.run_sync(run_worker, fmri_features_backfill, 0, 2) == 3
+    
+    assert await _feature_count(test_db) == 5
+
+
+@pytest.mark.asyncio
+async def test_duty_cycle_must_be_in_unit_interval(test_db):
+    connection = await test_db.connection()
+    for duty_cycle in (0, -0.5, 1.5):
+        with pytest.raises(ValueError):
+            await connection.run_sync(run_worker, fmri_features_backfill, duty_cycle=duty_cycle)
+        with pytest.raises(argparse.ArgumentTypeError):
+            _duty_cycle_arg(str(duty_cycle))
+    assert _duty_cycle_arg("0.5") == 0.5
+    with pytest.raises(argparse.ArgumentTypeError):
+        _duty_cycle_arg("half")
@@ -0,0 +1,100 @@
+import gzip
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from httpx import AsyncClient
+
+from app.compression import CompressedCache, CompressionMiddleware, negotiate
+from .test_main import test_client, override_get_db, test_db
+
+
+def test_negotiate_encoding():
+    assert negotiate("gzip, deflate, br", ["zstd", "br", "gzip"]) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", ["zstd", "br", "gzip"]) == "gzip"
+    assert negotiate("*;q=0.3, gzip;q=0", ["br", "gzip"]) == "br"
+    assert negotiate("identity", ["gzip"]) is None
+    assert negotiate("", ["gzip"]) is None
+
+
+@pytest.mark.asyncio
+async def test_large_json_responses_are_compressed(test_client):
+    create_response = await test_client.post(
+        "/api/patients/",
+        json={
+            "first_name": "Amara",
+            "last_name": "Okafor",
+            "date_of_birth": "1975-09-03",
+            "email": "amara.okafor@example.com",
+        },
+    )
+    patient_id = create_response.json()["id"]
+    for day in range(1, 11):
+        await test_client.post(
+            "/api/assessments/",
+            json={
+                "patient_id": patient_id,
+                "assessment_date": f"2025-01-{day:02d}",
+                "assessment_type": "fMRI",
+                "fmri_data": {"ecn_activation": [0.25] * 50},
+                "notes": "Reduced dorsolateral prefrontal activation during 2-back",
+            },
+        )
+    
+    response = await test_client.get(
+        f"/api/assessments/patient/{patient_id}", headers={"Accept-Encoding": "gzip"}
+    )
+    
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert len(response.json()) == 10
+    
+    response = await test_client.get("/api/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    response = await test_client.get(
+        f"/api/assessments/patient/{patient_id}", headers={"Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_streaming_responses_are_compressed_and_cached():
+    async def rows():
+        for i in range(200):
+            yield f'{{"id": {i}, "notes": "follow-up visit"}}\n'.encode()
+    
+    inner = FastAPI()
+    
+    @inner.get("/rows")
+    async def stream_rows():
+        return StreamingResponse(rows(), media_type="application/x-ndjson", headers={"ETag": '"v1"'})
+    
+    cache = CompressedCache(max_bytes=1024 * 1024, max_entry_bytes=1024 * 1024)
+    app = CompressionMiddleware(inner, minimum_size=256, thread_size=256, cache=cache)
+    expected = b"".join(f'{{"id": {i}, "notes": "follow-up visit"}}\n'.encode() for i in range(200))
+    
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        for _ in range(2):
+            async with client.stream("GET", "/rows", headers={"Accept-Encoding": "gzip"}) as response:
+                raw = b"".join([chunk async for chunk in response.aiter_raw()])
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.headers["etag"] == '"v1-gzip"'
+            assert gzip.decompress(raw) == expected
+    
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_precompressed_snapshot_parts_are_sent_as_is():
+    inner = FastAPI()
+    
+    @inner.get("/part")
+    async def part():
+        return Response(b"\0" * 4096, media_type="application/vnd.apache.arrow.file")
+    
+    async with AsyncClient(app=CompressionMiddleware(inner), base_url="http://test") as client:
+        response = await client.get("/part", headers={"Accept-Encoding": "gzip"})
+    
+    assert "content-encoding" not in response.headers
+    assert response.content == b"\0" * 4096
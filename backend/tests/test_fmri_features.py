@@ -0,0 +1,59 @@
+import pytest
+
+from app.services.fmri_features import extract_ecn_features
+from .test_main import test_client, override_get_db, test_db
+
+
+def test_extract_ecn_features():
+    features = extract_ecn_features(
+        {
+            "ecn_activation": {"left_dlpfc": 0.4, "right_dlpfc": 0.8, "parietal": 0.3},
+            "ecn_timeseries": [[1, 2, 3, 4], [2, 4, 6, 8], [4, 3, 2, 1]],
+            "n_back_activation": {"2-back": 0.9, "0-back": 0.2},
+        }
+    )
+    
+    assert features["ecn_mean_activation"] == pytest.approx(0.5)
+    assert features["ecn_peak_activation"] == pytest.approx(0.8)
+    assert features["ecn_mean_connectivity"] == pytest.approx(-1 / 3)
+    assert features["ecn_region_count"] == 3
+    assert features["n_back_load_effect"] == pytest.approx(0.7)
+
+
+def test_extract_ecn_features_unrecognised_payload():
+    assert extract_ecn_features(None) is None
+    assert extract_ecn_features({}) is None
+    assert extract_ecn_features({"scanner": "3T", "ecn_activation": "n/a"}) is None
+
+
+@pytest.mark.asyncio
+async def test_read_fmri_features(test_client):
+    create_response = await test_client.post(
+        "/api/patients/",
+        json={
+            "first_name": "Ines",
+            "last_name": "Moreau",
+            "date_of_birth": "1979-06-30",
+            "email": "ines.moreau@example.com",
+        },
+    )
+    patient_id = create_response.json()["id"]
+    
+    for activation in (0.1, 0.9):
+        await test_client.post(
+            "/api/assessments/",
+            json={
+                "patient_id": patient_id,
+                "assessment_date": "2025-02-01",
+                "assessment_type": "fMRI",
+                "fmri_data": {"ecn_activation": [activation, activation]},
+            },
+        )
+    
+    response = await test_client.get("/api/fmri/features", params={"max_mean_activation": 0.5})
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["patient_id"] == patient_id
+    assert data[0]["ecn_mean_activation"] == pytest.approx(0.1)
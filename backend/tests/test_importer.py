@@ -0,0 +1,85 @@
+import json
+import pytest
+from datetime import date
+
+from sqlalchemy.future import select
+
+from app.models.assessment import Assessment
+from app.models.biomarker_series import BiomarkerPoint
+from app.models.patient import Patient
+from app.services.importer import import_file
+from .test_main import test_db
+
+
+@pytest.fixture
+async def patient(test_db):
+    patient = Patient(
+        first_name="Grace",
+        last_name="Okafor",
+        date_of_birth=date(1983, 12, 5),
+        email="grace.okafor@example.com",
+    )
+    test_db.add(patient)
+    await test_db.commit()
+    return patient
+
+
+@pytest.mark.asyncio
+async def test_import_csv_resolves_emails_and_rejects_bad_rows(test_db, patient, tmp_path):
+    path = tmp_path / "assessments.csv"
+    path.write_text(
+        "patient_id,patient_email,assessment_date,assessment_type,crp_level,notes\n"
+        ",grace.okafor@example.com,2019-05-01,Biomarker Panel,3.1,\"baseline,\n fasting\"\n"
+        ",grace.okafor@example.com,not-a-date,Biomarker Panel,2.0,\n"
+        ",nobody@example.com,2019-05-02,Biomarker Panel,1.0,\n"
+        f"{patient.id},,2019-06-01,WPAI,,\n"
+        "999,,2019-06-02,WPAI,,\n"
+    )
+    
+    checkpoint = await import_file(test_db, "assessments", path, chunk_size=2)
+    
+    assert checkpoint.rows_imported == 2
+    assert checkpoint.rows_rejected == 3
+    assert checkpoint.records_read == 5
+    assert checkpoint.byte_offset == path.stat().st_size
+    
+    result = await test_db.execute(select(Assessment).order_by(Assessment.id))
+    assessments = result.scalars().all()
+    assert [a.patient_id for a in assessments] == [patient.id, patient.id]
+    assert assessments[0].notes == "baseline,\n fasting"
+    
+    result = await test_db.execute(select(BiomarkerPoint.value))
+    assert result.scalars().all() == [3.1]
+    
+    rejects = (tmp_path / "assessments.csv.rejects.ndjson").read_text().splitlines()
+    assert [json.loads(line)["record"] for line in rejects] == [2, 3, 5]
+    assert json.loads(rejects[2])["error"] == "Unknown patient id: 999"
+
+
+@pytest.mark.asyncio
+async def test_import_ndjson_resumes_from_checkpoint(test_db, patient, tmp_path):
+    path = tmp_path / "treatments.ndjson"
+    row = {
+        "patient_email": "grace.okafor@example.com",
+        "start_date": "2018-01-10",
+        "medication_name": "Ibuprofen",
+        "dosage": "400mg TID",
+        "frequency": "3 times daily",
+    }
+    path.write_text(json.dumps(row) + "\n")
+    
+    checkpoint = await import_file(test_db, "treatments", path)
+    assert checkpoint.rows_imported == 1
+    # A crash after writing a chunk's rejects but before its commit
+    rejects_path = tmp_path / "treatments.ndjson.rejects.ndjson"
+    rejects_path.write_text(json.dumps({"record": 3, "error": "Malformed JSON record"}) + "\n")
+    
+    # Re-running after the file grew only imports the appended records
+    with open(path, "a") as f:
+        f.write(json.dumps(dict(row, start_date="2018-03-10")) + "\n{not json\n")
+    checkpoint = await import_file(test_db, "treatments", path)
+    
+    assert checkpoint.rows_imported == 2
+    assert checkpoint.rows_rejected == 1
+    assert checkpoint.records_read == 3
+    assert [json.loads(line)["record"] for line in rejects_path.read_text().splitlines()] == [3]
@@ -4,7 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.base import Base
 
 # Use in-memory SQLite for testing
@@ -42,6 +42,7 @@ def override_get_db(test_db):
         yield test_db
     
     app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_read_db] = _override_get_db
     yield
     app.dependency_overrides.clear()
 
@@ -0,0 +1,64 @@
+import pytest
+
+from .test_main import test_client, override_get_db, test_db
+
+
+@pytest.mark.asyncio
+async def test_read_patients_with_fields(test_client):
+    await test_client.post(
+        "/api/patients/",
+        json={
+            "first_name": "Priya",
+            "last_name": "Raman",
+            "date_of_birth": "1992-07-19",
+            "email": "priya.raman@example.com",
+            "phone": "222-333-4444",
+        },
+    )
+    
+    response = await test_client.get("/api/patients/", params={"fields": "email, first_name"})
+    
+    assert response.status_code == 200
+    assert response.json() == [{"first_name": "Priya", "email": "priya.raman@example.com"}]
+
+
+@pytest.mark.asyncio
+async def test_read_assessment_with_fields(test_client):
+    create_response = await test_client.post(
+        "/api/patients/",
+        json={
+            "first_name": "Daniel",
+            "last_name": "Kim",
+            "date_of_birth": "1968-04-02",
+            "email": "daniel.kim@example.com",
+        },
+    )
+    patient_id = create_response.json()["id"]
+    create_response = await test_client.post(
+        "/api/assessments/",
+        json={
+            "patient_id": patient_id,
+            "assessment_date": "2025-05-05",
+            "assessment_type": "N-back Task",
+            "n_back_task_score": 71.5,
+            "notes": "Long free-text note",
+        },
+    )
+    assessment_id = create_response.json()["id"]
+    
+    response = await test_client.get(
+        f"/api/assessments/{assessment_id}", params={"fields": "assessment_date,n_back_task_score"}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"assessment_date": "2025-05-05", "n_back_task_score": 71.5}
+    
+    response = await test_client.get(f"/api/assessments/9999", params={"fields": "id"})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_read_with_unknown_fields(test_client):
+    response = await test_client.get("/api/treatments/", params={"fields": "id,password"})
+    
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: password"
@@ -0,0 +1,80 @@
+import asyncio
+import time
+import pytest
+from starlette.requests import Request
+
+from app import database
+from app.database import PRIMARY_COOKIE, ReplicaSet, get_read_db
+from .test_main import test_client, override_get_db, test_db
+
+
+def _request(cookie=None):
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+@pytest.mark.asyncio
+async def test_replica_set_round_robin_skips_unhealthy(tmp_path):
+    replicas = ReplicaSet(
+        [
+            f"sqlite:///{tmp_path / 'replica_a.db'}",
+            f"sqlite:///{tmp_path / 'missing' / 'replica_b.db'}",
+            f"sqlite:///{tmp_path / 'replica_c.db'}",
+        ]
+    )
+    
+    await replicas.check_all()
+    picked = [replicas.pick().url for _ in range(4)]
+    
+    assert [url.split("/")[-1] for url in picked] == ["replica_a.db", "replica_c.db"] * 2
+    assert replicas.replicas[1].healthy is False
+
+
+@pytest.mark.asyncio
+async def test_health_check_times_out_on_stalled_connect(tmp_path):
+    replicas = ReplicaSet([f"sqlite:///{tmp_path / 'replica.db'}"], health_timeout=0.05)
+    
+    async def stalled(replica):
+        await asyncio.sleep(10)
+    
+    replicas._ping = stalled
+    started = time.monotonic()
+    
+    assert await replicas.check(replicas.replicas[0]) is False
+    assert time.monotonic() - started < 1
+    assert replicas.pick() is None
+
+
+@pytest.mark.asyncio
+async def test_get_read_db_routing(tmp_path, monkeypatch):
+    replicas = ReplicaSet([f"sqlite:///{tmp_path / 'replica.db'}"])
+    monkeypatch.setattr(database, "read_replicas", replicas)
+    
+    async def session_url(request):
+        sessions = get_read_db(request)
+        session = await sessions.__anext__()
+        url = str(session.bind.url)
+        await sessions.aclose()
+        return url
+    
+    assert (await session_url(_request())).endswith("replica.db")
+    
+    # Reads right after a write stay on the primary
+    cookie = f"{PRIMARY_COOKIE}={int(time.time()) + 5}"
+    assert await session_url(_request(cookie)) == str(database.engine.url)
+
+
+@pytest.mark.asyncio
+async def test_write_sets_read_your_writes_cookie(test_client):
+    response = await test_client.post(
+        "/api/patients/",
+        json={
+            "first_name": "Elena",
+            "last_name": "Petrova",
+            "date_of_birth": "1987-01-23",
+            "email": "elena.petrova@example.com",
+        },
+    )
+    
+    assert response.status_code == 200
+    assert int(response.cookies[PRIMARY_COOKIE]) > time.time()
@@ -0,0 +1,50 @@
+import pytest
+
+from .test_main import test_client, override_get_db, test_db
+
+
+@pytest.mark.asyncio
+async def test_search_patients_and_notes(test_client):
+    create_response = await test_client.post(
+        "/api/patients/",
+        json={
+            "first_name": "Margaret",
+            "last_name": "Holloway",
+            "date_of_birth": "1961-10-08",
+            "email": "m.holloway@example.com",
+        },
+    )
+    patient_id = create_response.json()["id"]
+    create_response = await test_client.post(
+        "/api/treatments/",
+        json={
+            "patient_id": patient_id,
+            "start_date": "2025-01-15",
+            "medication_name": "Ibuprofen",
+            "dosage": "400mg TID",
+            "frequency": "3 times daily",
+            "notes": "Reported mild gastric discomfort in week two",
+        },
+    )
+    treatment_id = create_response.json()["id"]
+    
+    response = await test_client.get("/api/search/", params={"q": "marg holl"})
+    assert response.status_code == 200
+    hits = response.json()
+    assert [(hit["kind"], hit["id"]) for hit in hits] == [("patient", patient_id)]
+    
+    response = await test_client.get("/api/search/", params={"q": "gastric", "kind": "treatment"})
+    hits = response.json()
+    assert [(hit["kind"], hit["id"], hit["patient_id"]) for hit in hits] == [
+        ("treatment", treatment_id, patient_id)
+    ]
+    assert "<mark>gastric</mark>" in hits[0]["snippet"]
+    
+    # The index follows updates and deletes
+    await test_client.patch(f"/api/treatments/{treatment_id}", json={"notes": "No side effects"})
+    response = await test_client.get("/api/search/", params={"q": "gastric"})
+    assert response.json() == []
+    
+    await test_client.delete(f"/api/patients/{patient_id}")
+    response = await test_client.get("/api/search/", params={"q": "holloway"})
+    assert response.json() == []
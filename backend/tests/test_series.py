@@ -0,0 +1,87 @@
+import pytest
+
+from .test_main import test_client, override_get_db, test_db
+
+
+async def _create_patient(test_client, email):
+    response = await test_client.post(
+        "/api/patients/",
+        json={
+            "first_name": "Laura",
+            "last_name": "Chen",
+            "date_of_birth": "1988-02-14",
+            "email": email,
+        },
+    )
+    return response.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_read_patient_series_downsamples(test_client):
+    patient_id = await _create_patient(test_client, "laura.chen@example.com")
+    
+    for day in range(1, 21):
+        await test_client.post(
+            "/api/assessments/",
+            json={
+                "patient_id": patient_id,
+                "assessment_date": f"2025-01-{day:02d}",
+                "assessment_type": "Biomarker Panel",
+                "crp_level": float(day % 7),
+            },
+        )
+    
+    response = await test_client.get(
+        f"/api/patients/{patient_id}/series", params={"metric": "crp_level", "points": 5}
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_points"] == 20
+    assert len(data["points"]) == 5
+    assert data["points"][0]["recorded_on"] == "2025-01-01"
+    assert data["points"][-1]["recorded_on"] == "2025-01-20"
+    
+    # Min/max buckets keep the extremes
+    response = await test_client.get(
+        f"/api/patients/{patient_id}/series",
+        params={"metric": "crp_level", "points": 4, "method": "minmax"},
+    )
+    values = [p["value"] for p in response.json()["points"]]
+    assert len(values) <= 4
+    assert min(values) == 0.0
+    assert max(values) == 6.0
+
+
+@pytest.mark.asyncio
+async def test_patient_series_follows_assessment_writes(test_client):
+    patient_id = await _create_patient(test_client, "omar.haddad@example.com")
+    
+    create_response = await test_client.post(
+        "/api/assessments/",
+        json={
+            "patient_id": patient_id,
+            "assessment_date": "2025-03-01",
+            "assessment_type": "WPAI",
+            "wpai_score": 40.0,
+        },
+    )
+    assessment_id = create_response.json()["id"]
+    
+    await test_client.patch(f"/api/assessments/{assessment_id}", json={"wpai_score": 25.0})
+    response = await test_client.get(
+        f"/api/patients/{patient_id}/series", params={"metric": "wpai_score"}
+    )
+    assert response.json()["points"] == [{"recorded_on": "2025-03-01", "value": 25.0}]
+    
+    await test_client.delete(f"/api/assessments/{assessment_id}")
+    response = await test_client.get(
+        f"/api/patients/{patient_id}/series", params={"metric": "wpai_score"}
+    )
+    assert response.json()["total_points"] == 0
+
+
+@pytest.mark.asyncio
+async def test_read_patient_series_not_found(test_client):
+    response = await test_client.get("/api/patients/9999/series", params={"metric": "crp_level"})
+    assert response.status_code == 404
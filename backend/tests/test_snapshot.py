@@ -0,0 +1,120 @@
+import pytest
+from datetime import date
+
+from app.models.assessment import Assessment
+from app.models.patient import Patient
+from app.services.fmri_features import sync_fmri_features
+from app.services import snapshot
+from app.services.archive import archive_table
+from app.services.snapshot import SnapshotMismatch, export_snapshot
+from .test_main import test_db
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+async def _add_assessment(db, patient_id, fmri_data, assessment_date=date(2025, 4, 1)):
+    assessment = Assessment(
+        patient_id=patient_id,
+        assessment_date=assessment_date,
+        assessment_type="fMRI",
+        fmri_data=fmri_data,
+    )
+    db.add(assessment)
+    await db.flush()
+    await sync_fmri_features(db, assessment)
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_export_snapshot_appends_new_rows(test_db, tmp_path, monkeypatch):
+    patient = Patient(
+        first_name="Tomas",
+        last_name="Novak",
+        date_of_birth=date(1970, 9, 12),
+        email="tomas.novak@example.com",
+    )
+    test_db.add(patient)
+    await test_db.commit()
+    await _add_assessment(test_db, patient.id, {"ecn_activation": [0.2, 0.4]})
+    
+    manifest = await export_snapshot(test_db, tmp_path, chunk_size=1)
+    
+    assert {entry["table"]: entry["rows"] for entry in manifest} == {
+        "patients": 1,
+        "assessments": 1,
+        "treatments": 0,
+    }
+    table = pq.read_table(tmp_path / "assessments" / "part-00000.parquet")
+    assert table.column("fmri_data").to_pylist() == ['{"ecn_activation": [0.2, 0.4]}']
+    
+    # A second run only appends rows added since the previous snapshot
+    await _add_assessment(test_db, patient.id, None)
+    manifest = await export_snapshot(test_db, tmp_path, tables=["assessments"])
+    
+    assert manifest == [
+        {"table": "assessments", "file": "assessments/part-00001.parquet", "rows": 1, "since_id": 1}
+    ]
+    table = pq.read_table(tmp_path / "assessments" / "part-00001.parquet")
+    assert table.column("fmri_data").to_pylist() == [None]
+    
+    # Appending in another format or fMRI mode would mix schemas
+    with pytest.raises(SnapshotMismatch):
+        await export_snapshot(test_db, tmp_path, tables=["assessments"], fmt="arrow")
+    with pytest.raises(SnapshotMismatch):
+        await export_snapshot(test_db, tmp_path, tables=["assessments"], fmri="flatten")
+    
+    # A failed full snapshot leaves the previous parts in place
+    def fail_on_patients(table, fmri):
+        if table == "patients":
+            raise RuntimeError("export failed")
+        return export_columns(table, fmri)
+    
+    export_columns = snapshot._export_columns
+    monkeypatch.setattr(snapshot, "_export_columns", fail_on_patients)
+    with pytest.raises(RuntimeError):
+        await export_snapshot(test_db, tmp_path, tables=["assessments", "patients"], full=True)
+    monkeypatch.undo()
+    
+    assert sorted(p.name for p in (tmp_path / "assessments").iterdir()) == [
+        "part-00000.parquet",
+        "part-00001.parquet",
+    ]
+    assert list(tmp_path.glob(".full-*")) == []
+    
+    # A full snapshot replaces the previous parts
+    manifest = await export_snapshot(
+        test_db, tmp_path, tables=["assessments"], fmt="arrow", fmri="flatten", full=True
+    )
+    assert manifest[0]["rows"] == 2
+    assert manifest[0]["file"] == "assessments/part-00000.arrow"
+    assert [p.name for p in (tmp_path / "assessments").iterdir()] == ["part-00000.arrow"]
+    
+    await _add_assessment(test_db, patient.id, {"ecn_activation": [0.6, 0.8]})
+    manifest = await export_snapshot(test_db, tmp_path, tables=["assessments"], fmt="arrow", fmri="flatten")
+    assert manifest[0]["file"] == "assessments/part-00001.arrow"
+    assert manifest[0]["since_id"] == 2
+
+
+@pytest.mark.asyncio
+async def test_export_snapshot_includes_archived_rows(test_db, tmp_path):
+    patient = Patient(
+        first_name="Saskia",
+        last_name="Vos",
+        date_of_birth=date(1966, 1, 19),
+        email="saskia.vos@example.com",
+    )
+    test_db.add(patient)
+    await test_db.commit()
+    await _add_assessment(test_db, patient.id, {"ecn_activation": [0.1, 0.3]}, date(2010, 3, 1))
+    await _add_assessment(test_db, patient.id, None)
+    await export_snapshot(test_db, tmp_path, tables=["assessments"])
+    
+    await archive_table(test_db, "assessments", date(2020, 1, 1))
+    manifest = await export_snapshot(
+        test_db, tmp_path, tables=["assessments"], fmri="flatten", full=True
+    )
+    
+    assert manifest[0]["rows"] == 2
+    table = pq.read_table(tmp_path / "assessments" / "part-00000.parquet")
+    assert table.column("assessment_date").to_pylist() == [date(2010, 3, 1), date(2025, 4, 1)]
+    assert table.column("ecn_mean_activation").to_pylist() == [pytest.approx(0.2), None]
@@ -12,7 +12,9 @@ const PatientList = () => {
     const fetchPatients = async () => {
       try {
         setLoading(true);
-        const response = await api.patients.getAll();
+        const response = await api.patients.getAll({
+          fields: 'id,first_name,last_name,email,ecn_dysfunction_confirmed,inflammatory_markers_level',
+        });
         setPatients(response.data);
         setLoading(false);
       } catch (err) {
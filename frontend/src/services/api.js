@@ -5,6 +5,8 @@ const API_URL = 'http://localhost:8000/api';
 // Create axios instance with base URL
 const apiClient = axios.create({
   baseURL: API_URL,
+  // Send the read-your-writes cookie so reads after a write hit the primary
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json',
   },
@@ -14,8 +16,10 @@ const apiClient = axios.create({
 const api = {
   // Patient endpoints
   patients: {
-    getAll: () => apiClient.get('/patients'),
+    getAll: (params) => apiClient.get('/patients', { params }),
     getById: (id) => apiClient.get(`/patients/${id}`),
+    getSeries: (id, metric, points = 200) =>
+      apiClient.get(`/patients/${id}/series`, { params: { metric, points } }),
     create: (data) => apiClient.post('/patients', data),
     update: (id, data) => apiClient.patch(`/patients/${id}`, data),
     delete: (id) => apiClient.delete(`/patients/${id}`),
@@ -41,6 +45,11 @@ const api = {
     delete: (id) => apiClient.delete(`/treatments/${id}`),
   },
   
+  // Search endpoint
+  search: {
+    query: (q, params) => apiClient.get('/search', { params: { q, ...params } }),
+  },
+  
   // Health check endpoint
   health: {
     check: () => apiClient.get('/health'),